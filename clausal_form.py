@@ -1,6 +1,8 @@
 from logic_syntax import *
 from structure import *
 from itertools import count
+from typing import Callable, Iterator, Optional
+import functools
 
 
 _var_counter = count()
@@ -11,92 +13,258 @@ CONSTANT = "c"
 
 
 
-def clausal_form_converter(formula: Formula) -> List[Clause]:
+def clausal_form_converter(formula: Formula, share: bool = False, define_shared: bool = False) -> List[Clause]:
+    # share treats the formula as a DAG: identical subformulas are merged first and every pass
+    # handles each distinct node once. define_shared (needs share) also replaces conjunctions that
+    # distribution would copy by a definition literal, which keeps satisfiability but not equivalence.
+    if share:
+        return _dag_clausal_form(formula, define_shared)
     f1 = _eliminate_iff_imp(formula)
     f2 = _push_not_inward(f1)
-    f3 = _standardize_vars(f2)
+    f3 = _standardize_vars(_miniscope(f2))
     f4 = _skolemize(f3)
     f5 = _to_prenex(f4)
     f6 = _drop_universals(f5)
     f7 = _distribute_or_over_and(f6)
     return _extract_clauses(f7)
 
+def clausal_form_stream(formula: Formula) -> Iterator[Clause]:
+    # Same clauses as clausal_form_converter, but distribution happens lazily while iterating,
+    # so only the clause being built is held instead of the whole CNF
+    f1 = _eliminate_iff_imp(formula)
+    f2 = _push_not_inward(f1)
+    f3 = _standardize_vars(_miniscope(f2))
+    f4 = _skolemize(f3)
+    f5 = _to_prenex(f4)
+    f6 = _drop_universals(f5)
+    for literals in _iter_cnf(f6):
+        yield Clause(literals)
+
+def _memo_pass(key: Optional[Callable[[Formula], Any]] = None, idempotent: bool = False):
+    # Called with a memo dict, a pass computes each distinct (node, context) once. Entries keep their
+    # key objects alive so an id() cannot be reused during one conversion.
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(f, *context, memo=None):
+            if memo is None:
+                return fn(f, *context, memo=None)
+            k = key(f) if key is not None else id(f)
+            if context:
+                k = (k,) + tuple(id(c) for c in context)
+            hit = memo.get(k)
+            if hit is not None:
+                return hit[0]
+            result = fn(f, *context, memo=memo)
+            memo[k] = (result, f, context)
+            if idempotent:
+                memo.setdefault(id(result), (result, result, ()))
+            return result
+        return wrapper
+    return decorate
+
+
+def _share(formula: Formula) -> Formula:
+    # Hash-consing: rebuilds the formula bottom up so structurally equal subformulas are one object.
+    # Keys use the ids of already shared children, so each node is hashed in O(1).
+    table: Dict[Any, Formula] = {}
+    done: Dict[int, Formula] = {}
+    stack = [(formula, False)]
+    while stack:
+        f, expanded = stack.pop()
+        if id(f) in done:
+            continue
+        if isinstance(f, Literal):
+            done[id(f)] = table.setdefault(f, f)
+            continue
+        children = _children(f)
+        if not expanded:
+            stack.append((f, True))
+            stack.extend((c, False) for c in children if id(c) not in done)
+            continue
+        shared = tuple(done[id(c)] for c in children)
+        if isinstance(f, (ForAll, Exists)):
+            k = (type(f), f.var, f.domain, id(shared[0]))
+        else:
+            k = (type(f),) + tuple(id(c) for c in shared)
+        node = table.get(k)
+        if node is None:
+            node = _rebuild(f, shared)
+            table[k] = node
+        done[id(f)] = node
+    return done[id(formula)]
+
+def _children(f: Formula) -> tuple:
+    if isinstance(f, (And, Or, Iff)):
+        return (f.left, f.right)
+    if isinstance(f, Implies):
+        return (f.provided, f.then)
+    if isinstance(f, (Not, ForAll, Exists)):
+        return (f.sub,)
+    return ()
+
+def _rebuild(f: Formula, children: tuple) -> Formula:
+    if isinstance(f, (ForAll, Exists)):
+        return type(f)(f.var, children[0], f.domain)
+    return type(f)(*children)
+
+def _dag_clausal_form(formula: Formula, define_shared: bool) -> List[Clause]:
+    f0 = _share(formula)
+    f1 = _eliminate_imp(_eliminate_iff(f0, memo={}), memo={})
+    f2 = _push_not_inward(f1, memo={})
+    f3 = _standardize_vars(_miniscope(f2, memo={}), memo={})
+    f4 = _skolemize(f3, memo={})
+    f5 = _to_prenex(f4, memo={})
+    f6 = _drop_universals(f5)
+    definitions: List[tuple[Literal, Formula]] = []
+    if define_shared:
+        f6 = _define_shared(f6, _reference_counts(f6), {}, definitions)
+    f7 = _distribute_or_over_and(f6, memo={})
+    clauses = list(dict.fromkeys(_extract_clauses(f7, shared=True)))
+    seen = set(clauses)
+    for lit, body in definitions:
+        # def(x̄) → body, the other direction is not needed because body only occurs positively
+        for literals in _iter_cnf(body):
+            c = Clause(literals | {lit.negate()})
+            if c not in seen:
+                seen.add(c)
+                clauses.append(c)
+    return clauses
+
+def _reference_counts(f: Formula) -> Dict[int, int]:
+    refs: Dict[int, int] = {}
+    stack = [f]
+    while stack:
+        g = stack.pop()
+        refs[id(g)] = refs.get(id(g), 0) + 1
+        if refs[id(g)] == 1:
+            stack.extend(_children(g))
+    return refs
+
+def _define_shared(f: Formula, refs: Dict[int, int], defs: Dict[int, Literal],
+                   out: List[tuple[Literal, Formula]]) -> Formula:
+    # Under an Or, a conjunction with several parents would be copied by every distribution,
+    # so it is named once by a fresh literal over its free variables
+    if isinstance(f, Or):
+        return Or(_define_operand(f.left, refs, defs, out), _define_operand(f.right, refs, defs, out))
+    if isinstance(f, And):
+        return And(_define_shared(f.left, refs, defs, out), _define_shared(f.right, refs, defs, out))
+    return f
+
+def _define_operand(f: Formula, refs: Dict[int, int], defs: Dict[int, Literal],
+                    out: List[tuple[Literal, Formula]]) -> Formula:
+    if isinstance(f, And) and refs.get(id(f), 0) > 1:
+        lit = defs.get(id(f))
+        if lit is None:
+            body = _define_shared(f, refs, defs, out)
+            args = tuple(sorted(_formula_vars(body), key=lambda v: v.name))
+            lit = Literal(f"def_{next(_var_counter)}", args)
+            defs[id(f)] = lit
+            out.append((lit, body))
+        return lit
+    return _define_shared(f, refs, defs, out)
+
+def _formula_vars(f: Formula) -> set:
+    # Every variable occurring in f, bound or not. Shared nodes are only walked once.
+    found = set()
+    visited = set()
+    stack = [f]
+    while stack:
+        g = stack.pop()
+        if id(g) in visited:
+            continue
+        visited.add(id(g))
+        if isinstance(g, Literal):
+            stack.extend(g.args)
+        elif isinstance(g, Function):
+            stack.extend(g.args)
+        elif isinstance(g, Var):
+            if g.type != CONSTANT:
+                found.add(g)
+        else:
+            stack.extend(_children(g))
+    return found
+
+
 def _eliminate_iff_imp(formula: Formula) -> Formula:
     f = _eliminate_iff(formula)
     return _eliminate_imp(f)
 
-def _eliminate_iff(formula: Formula) -> Formula:
+@_memo_pass()
+def _eliminate_iff(formula: Formula, memo: Optional[dict] = None) -> Formula:
     # A ↔ B  ≡  (A→B) ∧ (B→A)
     if isinstance(formula, Iff):
-        left = _eliminate_iff(formula.left)
-        right = _eliminate_iff(formula.right)
+        left = _eliminate_iff(formula.left, memo=memo)
+        right = _eliminate_iff(formula.right, memo=memo)
         return And(Implies(left, right), Implies(right, left))
     
     if isinstance(formula, Implies):
-        return Implies(_eliminate_iff(formula.provided), _eliminate_iff(formula.then))
+        return Implies(_eliminate_iff(formula.provided, memo=memo), _eliminate_iff(formula.then, memo=memo))
     
     if isinstance(formula, And):
-        return And(_eliminate_iff(formula.left), _eliminate_iff(formula.right))
+        return And(_eliminate_iff(formula.left, memo=memo), _eliminate_iff(formula.right, memo=memo))
     
     if isinstance(formula, Or):
-        return Or(_eliminate_iff(formula.left), _eliminate_iff(formula.right))
+        return Or(_eliminate_iff(formula.left, memo=memo), _eliminate_iff(formula.right, memo=memo))
     
     if isinstance(formula, Not):
-        return Not(_eliminate_iff(formula.sub))
+        return Not(_eliminate_iff(formula.sub, memo=memo))
     
     if isinstance(formula, ForAll):
-        return ForAll(formula.var, _eliminate_iff(formula.sub))
+        return ForAll(formula.var, _eliminate_iff(formula.sub, memo=memo))
     
     if isinstance(formula, Exists):
-        return Exists(formula.var, _eliminate_iff(formula.sub))
+        return Exists(formula.var, _eliminate_iff(formula.sub, memo=memo))
     
     return formula
 
 
-def _eliminate_imp(formula: Formula) -> Formula:
+@_memo_pass()
+def _eliminate_imp(formula: Formula, memo: Optional[dict] = None) -> Formula:
     # A→B  ≡  ¬A ∨ B
     if isinstance(formula, Implies):
-        return Or(Not(_eliminate_imp(formula.provided)), _eliminate_imp(formula.then))
+        return Or(Not(_eliminate_imp(formula.provided, memo=memo)), _eliminate_imp(formula.then, memo=memo))
     
     if isinstance(formula, And):
-        return And(_eliminate_imp(formula.left), _eliminate_imp(formula.right))
+        return And(_eliminate_imp(formula.left, memo=memo), _eliminate_imp(formula.right, memo=memo))
     
     if isinstance(formula, Or):
-        return Or(_eliminate_imp(formula.left), _eliminate_imp(formula.right))
+        return Or(_eliminate_imp(formula.left, memo=memo), _eliminate_imp(formula.right, memo=memo))
     
     if isinstance(formula, Not):
-        return Not(_eliminate_imp(formula.sub))
+        return Not(_eliminate_imp(formula.sub, memo=memo))
     
     if isinstance(formula, ForAll):
-        return ForAll(formula.var, _eliminate_imp(formula.sub))
+        return ForAll(formula.var, _eliminate_imp(formula.sub, memo=memo))
     
     if isinstance(formula, Exists):
-        return Exists(formula.var, _eliminate_imp(formula.sub))
+        return Exists(formula.var, _eliminate_imp(formula.sub, memo=memo))
     
     return formula
 
-def _push_not_inward(f: Formula) -> Formula:
+# A fresh Not(A) built during the pass is keyed by A, so negated shared nodes are reused too
+@_memo_pass(key=lambda f: ("¬", id(f.sub)) if isinstance(f, Not) else id(f))
+def _push_not_inward(f: Formula, memo: Optional[dict] = None) -> Formula:
     if isinstance(f, Not):
         sub = f.sub
 
         if isinstance(sub, Not):
-            return _push_not_inward(sub.sub)  # ¬¬A ≡ A
+            return _push_not_inward(sub.sub, memo=memo)  # ¬¬A ≡ A
         
         if isinstance(sub, And):
             # ¬(A∧B) ≡ ¬A ∨ ¬B
-            return Or(_push_not_inward(Not(sub.left)), _push_not_inward(Not(sub.right)))
+            return Or(_push_not_inward(Not(sub.left), memo=memo), _push_not_inward(Not(sub.right), memo=memo))
         
         if isinstance(sub, Or):
             # ¬(A∨B) ≡ ¬A ∧ ¬B
-            return And(_push_not_inward(Not(sub.left)), _push_not_inward(Not(sub.right)))
+            return And(_push_not_inward(Not(sub.left), memo=memo), _push_not_inward(Not(sub.right), memo=memo))
         
         if isinstance(sub, ForAll):
             # ¬∀x.A ≡ ∃x.¬A
-            return Exists(sub.var, _push_not_inward(Not(sub.sub)))
+            return Exists(sub.var, _push_not_inward(Not(sub.sub), memo=memo))
         
         if isinstance(sub, Exists):
             # ¬∃x.A ≡ ∀x.¬A
-            return ForAll(sub.var, _push_not_inward(Not(sub.sub)))
+            return ForAll(sub.var, _push_not_inward(Not(sub.sub), memo=memo))
         
         if isinstance(sub, Literal):
             return sub.negate()
@@ -104,24 +272,78 @@ def _push_not_inward(f: Formula) -> Formula:
         return f
     
     if isinstance(f, And):
-        return And(_push_not_inward(f.left), _push_not_inward(f.right))
+        return And(_push_not_inward(f.left, memo=memo), _push_not_inward(f.right, memo=memo))
     
     if isinstance(f, Or):
-        return Or(_push_not_inward(f.left), _push_not_inward(f.right))
+        return Or(_push_not_inward(f.left, memo=memo), _push_not_inward(f.right, memo=memo))
     
     if isinstance(f, ForAll):
-        return ForAll(f.var, _push_not_inward(f.sub))
+        return ForAll(f.var, _push_not_inward(f.sub, memo=memo))
     
     if isinstance(f, Exists):
-        return Exists(f.var, _push_not_inward(f.sub))
+        return Exists(f.var, _push_not_inward(f.sub, memo=memo))
     
     return f # Literal
 
 
-def _standardize_vars(formula: Formula) -> Formula:
-    return _standardize_helper(formula, {})
+def _miniscope(f: Formula, memo: Optional[dict] = None) -> Formula:
+    # Antiprenexing on NNF: quantifiers move as far inward as ∧ and ∨ allow and vacuous ones are dropped,
+    # so a Skolem function later only depends on the universals its existential really sits under
+    return _miniscope_helper(f, {}, memo=memo)
 
-def _standardize_helper(f: Formula, env: Dict[Var, Var]) -> Formula:
+@_memo_pass()
+def _miniscope_helper(f: Formula, frees: Dict[int, Any], memo: Optional[dict] = None) -> Formula:
+    if isinstance(f, ForAll) or isinstance(f, Exists):
+        sub = _miniscope_helper(f.sub, frees, memo=memo)
+        return _push_quantifier(type(f), f.var, f.domain, sub, frees)
+
+    elif isinstance(f, And):
+        return And(_miniscope_helper(f.left, frees, memo=memo), _miniscope_helper(f.right, frees, memo=memo))
+
+    elif isinstance(f, Or):
+        return Or(_miniscope_helper(f.left, frees, memo=memo), _miniscope_helper(f.right, frees, memo=memo))
+
+    elif isinstance(f, Not):
+        return Not(_miniscope_helper(f.sub, frees, memo=memo))
+
+    return f
+
+def _push_quantifier(q: type, var: Var, domain: str, f: Formula, frees: Dict[int, Any]) -> Formula:
+    if var not in _scoped_free_vars(f, frees):
+        return f
+    if isinstance(f, And) or isinstance(f, Or):
+        # ∀x(A∧B) ≡ ∀xA ∧ ∀xB and ∃x(A∨B) ≡ ∃xA ∨ ∃xB
+        if (q is ForAll) == isinstance(f, And):
+            left = _push_quantifier(q, var, domain, f.left, frees)
+            right = left if f.right is f.left else _push_quantifier(q, var, domain, f.right, frees)
+            return type(f)(left, right)
+        # ∀x(A∨B) ≡ A ∨ ∀xB when x is not free in A, likewise for ∃ over ∧
+        if var not in _scoped_free_vars(f.left, frees):
+            return type(f)(f.left, _push_quantifier(q, var, domain, f.right, frees))
+        if var not in _scoped_free_vars(f.right, frees):
+            return type(f)(_push_quantifier(q, var, domain, f.left, frees), f.right)
+    return q(var, f, domain)
+
+def _scoped_free_vars(f: Formula, frees: Dict[int, Any]) -> frozenset:
+    # Free variables respecting binders, cached per node (the node is kept so its id stays valid)
+    hit = frees.get(id(f))
+    if hit is not None:
+        return hit[0]
+    if isinstance(f, Literal):
+        found = frozenset(_formula_vars(f))
+    elif isinstance(f, ForAll) or isinstance(f, Exists):
+        found = _scoped_free_vars(f.sub, frees) - {f.var}
+    else:
+        found = frozenset().union(*(_scoped_free_vars(c, frees) for c in _children(f)))
+    frees[id(f)] = (found, f)
+    return found
+
+
+def _standardize_vars(formula: Formula, memo: Optional[dict] = None) -> Formula:
+    return _standardize_helper(formula, {}, memo=memo)
+
+@_memo_pass()
+def _standardize_helper(f: Formula, env: Dict[Var, Var], memo: Optional[dict] = None) -> Formula:
     if isinstance(f, ForAll) or isinstance(f, Exists):
         old_var = f.var
         new_name = f"{old_var.name}_{next(_var_counter)}"
@@ -130,16 +352,16 @@ def _standardize_helper(f: Formula, env: Dict[Var, Var]) -> Formula:
         new_env = env.copy()
         new_env[old_var] = new_var
 
-        return type(f)(new_var, _standardize_helper(f.sub, new_env))
+        return type(f)(new_var, _standardize_helper(f.sub, new_env, memo=memo))
 
     elif isinstance(f, Not):
-        return Not(_standardize_helper(f.sub, env))
+        return Not(_standardize_helper(f.sub, env, memo=memo))
 
     elif isinstance(f, And):
-        return And(_standardize_helper(f.left, env), _standardize_helper(f.right, env))
+        return And(_standardize_helper(f.left, env, memo=memo), _standardize_helper(f.right, env, memo=memo))
 
     elif isinstance(f, Or):
-        return Or(_standardize_helper(f.left, env), _standardize_helper(f.right, env))
+        return Or(_standardize_helper(f.left, env, memo=memo), _standardize_helper(f.right, env, memo=memo))
 
     elif isinstance(f, Literal):
         new_args = []
@@ -173,33 +395,41 @@ def _nested_standardize_function(f: Function, env: Dict[Var, Var]) -> Function:
 
 
 
-def _skolemize(f: Formula) -> Formula:
-    return _skolemize_helper(f, [], {})
+def _skolemize(f: Formula, memo: Optional[dict] = None) -> Formula:
+    return _skolemize_helper(f, [], {}, memo=memo)
 
-def _skolemize_helper(f: Formula, uvars: List[Var], env: Dict[str, Any]) -> Formula:
+@_memo_pass()
+def _skolemize_helper(f: Formula, uvars: List[Var], env: Dict[str, Any], memo: Optional[dict] = None) -> Formula:
     if isinstance(f, ForAll):
-        new_sub = _skolemize_helper(f.sub, uvars + [f.var], env)
+        new_sub = _skolemize_helper(f.sub, uvars + [f.var], env, memo=memo)
         return ForAll(f.var, new_sub)
 
     elif isinstance(f, Exists):
         name = f"sk_{next(_var_counter)}"
-        if uvars:
-            sk_term = Function(name="f"+name, args=tuple(uvars), range=f.var.type)
+        # Only the universals in scope that the body mentions become Skolem arguments, counting the
+        # ones inside the Skolem terms that replace outer existentials occurring in the body
+        used = _formula_vars(f.sub)
+        for v in list(used):
+            if v.name in env:
+                used |= _formula_vars(env[v.name])
+        args = tuple(v for v in uvars if v in used)
+        if args:
+            sk_term = Function(name="f"+name, args=args, range=f.var.type)
         else:
             sk_term = Var(name="c"+name, type=CONSTANT, domain=f.var.domain)
 
         new_env = env.copy()
         new_env[f.var.name] = sk_term
-        return _skolemize_helper(f.sub, uvars, new_env)
+        return _skolemize_helper(f.sub, uvars, new_env, memo=memo)
 
     elif isinstance(f, Not):
-        return Not(_skolemize_helper(f.sub, uvars, env))
+        return Not(_skolemize_helper(f.sub, uvars, env, memo=memo))
 
     elif isinstance(f, And):
-        return And(_skolemize_helper(f.left, uvars, env), _skolemize_helper(f.right, uvars, env))
+        return And(_skolemize_helper(f.left, uvars, env, memo=memo), _skolemize_helper(f.right, uvars, env, memo=memo))
 
     elif isinstance(f, Or):
-        return Or(_skolemize_helper(f.left, uvars, env), _skolemize_helper(f.right, uvars, env))
+        return Or(_skolemize_helper(f.left, uvars, env, memo=memo), _skolemize_helper(f.right, uvars, env, memo=memo))
     
     elif isinstance(f, Literal):
         new_args = []
@@ -235,77 +465,164 @@ def _nested_skolemize_function(f: Function, uvars: List[Var], env: Dict[str, Any
     return Function(f.name, tuple(new_args), range=f.range)
 
 
-def _to_prenex(f: Formula) -> Formula:
-    quantifiers, body = _pull_quantifiers(f) 
+def _to_prenex(f: Formula, memo: Optional[dict] = None) -> Formula:
+    quantifiers, body = _pull_quantifiers(f, memo) 
+    seen = set()
     for q in quantifiers:
-        body = ForAll(q.var, body)
+        # A shared subformula can contribute the same quantifier twice, ∀x∀x A ≡ ∀x A
+        if q.var not in seen:
+            seen.add(q.var)
+            body = ForAll(q.var, body)
     return body
 
-def _pull_quantifiers(f: Formula) -> tuple[list[ForAll], Formula]:
+def _pull_quantifiers(f: Formula, memo: Optional[dict] = None) -> tuple[list[ForAll], Formula]:
+    # The quantifier lists get extended by the callers, so memo hits hand out copies
+    if memo is not None:
+        hit = memo.get(id(f))
+        if hit is not None:
+            return list(hit[0]), hit[1]
     if isinstance(f, ForAll):
-        qs, body = _pull_quantifiers(f.sub)
+        qs, body = _pull_quantifiers(f.sub, memo)
         qs.append(f)
-        return qs, body
     elif isinstance(f, And):
-        ql1, f1 = _pull_quantifiers(f.left)
-        ql2, f2 = _pull_quantifiers(f.right)
-        ql1.extend(ql2)
-        return ql1, And(f1, f2)
+        ql1, f1 = _pull_quantifiers(f.left, memo)
+        ql2, f2 = _pull_quantifiers(f.right, memo)
+        _merge_quantifiers(ql1, ql2, memo)
+        qs, body = ql1, And(f1, f2)
     elif isinstance(f, Or):
-        ql1, f1 = _pull_quantifiers(f.left)
-        ql2, f2 = _pull_quantifiers(f.right)
-        ql1.extend(ql2)
-        return ql1, Or(f1, f2)
+        ql1, f1 = _pull_quantifiers(f.left, memo)
+        ql2, f2 = _pull_quantifiers(f.right, memo)
+        _merge_quantifiers(ql1, ql2, memo)
+        qs, body = ql1, Or(f1, f2)
     else:
         return [], f
+    if memo is not None:
+        memo[id(f)] = (tuple(qs), body, f)
+    return qs, body
+
+
+def _merge_quantifiers(ql1: list[ForAll], ql2: list[ForAll], memo: Optional[dict]) -> None:
+    # Both sides of a DAG node can reach the same shared quantifier, keep it once so the lists stay small
+    if memo is None:
+        ql1.extend(ql2)
+    else:
+        seen = {q.var for q in ql1}
+        ql1.extend(q for q in ql2 if q.var not in seen)
 
-    
 def _drop_universals(f: Formula):
     while isinstance(f, ForAll):
         f = f.sub
     return f
 
-def _distribute_or_over_and(f: Formula) -> Formula:
+# The disjunctions built while distributing are fresh objects, so an Or is keyed by its operands.
+# Distributing an already distributed node changes nothing, so results are memoized as inputs too.
+@_memo_pass(key=lambda f: ("∨", id(f.left), id(f.right)) if isinstance(f, Or) else id(f), idempotent=True)
+def _distribute_or_over_and(f: Formula, memo: Optional[dict] = None) -> Formula:
     if isinstance(f, Or):
         # Must run the function over left and right first. It changes there format, then we check if ours matches the distributive format
-        left = _distribute_or_over_and(f.left)
-        right = _distribute_or_over_and(f.right)
+        left = _distribute_or_over_and(f.left, memo=memo)
+        right = _distribute_or_over_and(f.right, memo=memo)
 
         # A ∨ (B ∧ C) → (A ∨ B) ∧ (A ∨ C)
         if isinstance(right, And):
             return And(
-                _distribute_or_over_and(Or(left, right.left)),
-                _distribute_or_over_and(Or(left, right.right))
+                _distribute_or_over_and(Or(left, right.left), memo=memo),
+                _distribute_or_over_and(Or(left, right.right), memo=memo)
             )
 
         # (A ∧ B) ∨ C → (A ∨ C) ∧ (B ∨ C)
         if isinstance(left, And):
             return And(
-                _distribute_or_over_and(Or(left.left, right)),
-                _distribute_or_over_and(Or(left.right, right))
+                _distribute_or_over_and(Or(left.left, right), memo=memo),
+                _distribute_or_over_and(Or(left.right, right), memo=memo)
             )
         
         return Or(left, right)
 
     elif isinstance(f, And):
-        return And(_distribute_or_over_and(f.left), _distribute_or_over_and(f.right))
+        return And(_distribute_or_over_and(f.left, memo=memo), _distribute_or_over_and(f.right, memo=memo))
 
     elif isinstance(f, Not):
-        return Not(_distribute_or_over_and(f.sub))
+        return Not(_distribute_or_over_and(f.sub, memo=memo))
     
     return f
 
-def _extract_clauses(f: Formula) -> List[Clause]:
-    if isinstance(f, And):
-        return _extract_clauses(f.left) + _extract_clauses(f.right)
-    else:
-        return [Clause(frozenset(_collect_literals(f)))]
-
-def _collect_literals(f: Formula) -> List[Formula]:
-    if isinstance(f, Literal):
-        return [f]
-    elif isinstance(f, Or):
-        return _collect_literals(f.left) + _collect_literals(f.right)
-    else:
-        raise ValueError(f"Expected Literal or Not(Literal) or Or, got: {type(f).__name__}")
+def _extract_clauses(f: Formula, shared: bool = False) -> List[Clause]:
+    # Explicit stacks instead of left + right, which was quadratic on long And/Or chains.
+    # With shared, a node reached twice in a DAG is only extracted once.
+    clauses = []
+    visited = set()
+    stack = [f]
+    while stack:
+        g = stack.pop()
+        if shared:
+            if id(g) in visited:
+                continue
+            visited.add(id(g))
+        if isinstance(g, And):
+            stack.append(g.right)
+            stack.append(g.left)
+        else:
+            clauses.append(Clause(frozenset(_collect_literals(g, shared))))
+    return clauses
+
+def _collect_literals(f: Formula, shared: bool = False) -> List[Formula]:
+    literals = []
+    visited = set()
+    stack = [f]
+    while stack:
+        g = stack.pop()
+        if shared:
+            if id(g) in visited:
+                continue
+            visited.add(id(g))
+        if isinstance(g, Literal):
+            literals.append(g)
+        elif isinstance(g, Or):
+            stack.append(g.right)
+            stack.append(g.left)
+        else:
+            raise ValueError(f"Expected Literal or Not(Literal) or Or, got: {type(g).__name__}")
+    return literals
+
+def _iter_cnf(f: Formula) -> Iterator[frozenset]:
+    # Yields the clauses of the CNF of an NNF formula one literal set at a time
+    stack = [f]
+    while stack:
+        g = stack.pop()
+        if isinstance(g, And):
+            stack.append(g.right)
+            stack.append(g.left)
+        elif isinstance(g, Or):
+            base, conjunctions = _split_disjuncts(g)
+            yield from _iter_product(conjunctions, 0, base)
+        elif isinstance(g, Literal):
+            yield frozenset((g,))
+        else:
+            raise ValueError(f"Expected Literal or Not(Literal) or Or, got: {type(g).__name__}")
+
+def _split_disjuncts(f: Or) -> tuple[frozenset, List[Formula]]:
+    # (A ∨ (B ∧ C) ∨ D) → literals {A, D} and the conjunctions still to distribute [(B ∧ C)]
+    literals, conjunctions = [], []
+    stack = [f]
+    while stack:
+        g = stack.pop()
+        if isinstance(g, Or):
+            stack.append(g.right)
+            stack.append(g.left)
+        elif isinstance(g, Literal):
+            literals.append(g)
+        elif isinstance(g, And):
+            conjunctions.append(g)
+        else:
+            raise ValueError(f"Expected Literal or Not(Literal) or Or, got: {type(g).__name__}")
+    return frozenset(literals), conjunctions
+
+def _iter_product(conjunctions: List[Formula], i: int, base: frozenset) -> Iterator[frozenset]:
+    # A ∨ (B ∧ C) → (A ∨ B) ∧ (A ∨ C), regenerating the later conjunctions instead of storing them
+    if i == len(conjunctions):
+        yield base
+        return
+    for clause in _iter_cnf(conjunctions[i]):
+        yield from _iter_product(conjunctions, i + 1, base | clause)
 
@@ -0,0 +1,68 @@
+from structure import *
+from typing import Iterable, Iterator, TextIO
+
+
+# DIMACS variable n is read as the propositional literal named f"{prefix}{n}"
+DEFAULT_PREFIX = "p"
+
+
+def read_dimacs(lines: Iterable[str], prefix: str = DEFAULT_PREFIX) -> Iterator[Clause]:
+    # Streams clauses one at a time, a clause may span several lines and ends at its 0
+    pending: list[Literal] = []
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line[0] in "cp%":
+            # % ends the body in some SATLIB files
+            if line[:1] == "%":
+                break
+            continue
+        for token in line.split():
+            try:
+                n = int(token)
+            except ValueError:
+                raise ValueError(f"line {lineno}: expected an integer, got {token!r}") from None
+            if n == 0:
+                yield Clause(frozenset(pending))
+                pending = []
+            else:
+                pending.append(Literal(f"{prefix}{abs(n)}", (), n > 0))
+    if pending:
+        yield Clause(frozenset(pending))
+
+def load_dimacs(lines: Iterable[str], kb: KB, prefix: str = DEFAULT_PREFIX) -> int:
+    return kb.add_clauses(read_dimacs(lines, prefix))
+
+
+def _numbering(kb: KB, prefix: str) -> Dict[str, int]:
+    # Names already of the form prefix + number keep their number, the rest get fresh ones after them
+    numbers, others = {}, []
+    for clause in kb.clauses:
+        for lit in clause.literals:
+            if lit.args:
+                raise ValueError(f"DIMACS only holds propositional literals, got {lit}")
+            if lit.name in numbers:
+                continue
+            suffix = lit.name[len(prefix):]
+            if lit.name.startswith(prefix) and suffix.isdigit() and suffix[0] != "0":
+                numbers[lit.name] = int(suffix)
+            else:
+                numbers[lit.name] = 0
+                others.append(lit.name)
+    used = set(numbers.values())
+    n = 0
+    for name in others:
+        n += 1
+        while n in used:
+            n += 1
+        numbers[name] = n
+    return numbers
+
+def write_dimacs(kb: KB, out: TextIO, prefix: str = DEFAULT_PREFIX) -> Dict[str, int]:
+    # Two passes over KB.clauses, the first only builds the variable numbering for the header
+    numbers = _numbering(kb, prefix)
+    out.write(f"p cnf {max(numbers.values(), default=0)} {len(kb.clauses)}\n")
+    for clause in kb.clauses:
+        for lit in clause.literals:
+            out.write(f"{numbers[lit.name] if lit.positive else -numbers[lit.name]} ")
+        out.write("0\n")
+    return numbers
@@ -0,0 +1,212 @@
+from logic_syntax import *
+from structure import Literal
+from superposition import EQUALITY
+from clausal_form import UNIVERSAL, EXISTENTIAL, CONSTANT
+from typing import Iterable, Iterator, List
+import re
+import sys
+
+
+# Unicode as printed by the __str__ methods, plus an ASCII spelling of every connective
+_OPERATORS = {
+    "¬": "not", "~": "not",
+    "∧": "and", "&": "and",
+    "∨": "or", "|": "or",
+    "→": "imp", "->": "imp",
+    "↔": "iff", "<->": "iff",
+    "∀": "all", "∃": "ex",
+    "=": "eq", "≠": "neq", "!=": "neq",
+    "(": "(", ")": ")", ",": ",", ".": ",",
+}
+# Token kinds, anything missing here is an identifier. Stray pieces of -> and <-> get a kind
+# the parser never accepts, so they surface as ordinary parse errors.
+_KINDS = dict(_OPERATORS, forall="all", exists="ex", **{"<": "?", ">": "?", "-": "?", "!": "?"})
+
+_TOKEN = re.compile(r"[\w][\w']*|<->|->|!=|[¬~∧&∨|→↔∀∃(),.=≠]|\S")
+_BAD = re.compile(r"[^\s\w'¬~∧&∨|→↔∀∃(),.<>=≠!-]")
+
+# Binding power and right associativity of the binary connectives
+_BINARY = {"iff": (1, True), "imp": (2, True), "or": (3, False), "and": (4, False)}
+_BUILD = {"iff": Iff, "imp": Implies, "or": Or, "and": And}
+
+_ASCII = {"¬": "~", "∧": "&", "∨": "|", "→": "->", "↔": "<->", "≠": "!="}
+
+
+class ParseError(ValueError):
+    pass
+
+
+def tokenize(text: str) -> tuple[List[str], List[str]]:
+    # Single regex pass, returns parallel lists of token kinds and (interned) token texts
+    bad = _BAD.search(text)
+    if bad:
+        raise ParseError(f"Unexpected character {bad.group()!r} at offset {bad.start()}")
+    texts = list(map(sys.intern, _TOKEN.findall(text)))
+    return [_KINDS.get(t, "id") for t in texts], texts
+
+
+class _Parser:
+    # Precedence climbing over one formula's tokens. Vars and constants are cached so repeated
+    # symbols share a single object across everything this parser reads.
+    def __init__(self):
+        self.kinds: List[str] = []
+        self.texts: List[str] = []
+        self.pos = 0
+        self.bound: Dict[str, Var] = {}
+        self._vars: Dict[tuple[str, str], Var] = {}
+
+    def parse(self, kinds: List[str], texts: List[str]) -> Formula:
+        # The trailing sentinel saves a bounds check on every lookahead
+        self.kinds = kinds + ["end"]
+        self.texts = texts + ["end of input"]
+        self.pos = 0
+        self.bound = {}
+        f = self._formula(0)
+        if self.pos != len(kinds):
+            raise ParseError(f"Unexpected {self.texts[self.pos]!r} after a complete formula")
+        return f
+
+    def _expect(self, kind: str) -> str:
+        pos = self.pos
+        if self.kinds[pos] != kind:
+            raise ParseError(f"Expected {kind!r} but found {self.texts[pos]!r}")
+        self.pos = pos + 1
+        return self.texts[pos]
+
+    def _var(self, name: str, kind: str) -> Var:
+        key = (name, kind)
+        v = self._vars.get(key)
+        if v is None:
+            v = self._vars[key] = Var(name, kind)
+        return v
+
+    def _formula(self, min_power: int) -> Formula:
+        left = self._unary()
+        while True:
+            kind = self.kinds[self.pos]
+            op = _BINARY.get(kind)
+            if op is None or op[0] < min_power:
+                return left
+            self.pos += 1
+            right = self._formula(op[0] if op[1] else op[0] + 1)
+            left = _BUILD[kind](left, right)
+
+    def _unary(self) -> Formula:
+        kind = self.kinds[self.pos]
+        if kind == "id":
+            return self._atom()
+        if kind == "not":
+            self.pos += 1
+            sub = self._unary()
+            if isinstance(sub, Literal) and sub.positive:
+                return sub.negate()
+            return Not(sub)
+        if kind == "all" or kind == "ex":
+            return self._quantified(kind)
+        if kind == "(":
+            self.pos += 1
+            f = self._formula(0)
+            self._expect(")")
+            return f
+        raise ParseError(f"Expected a formula but found {self.texts[self.pos]!r}")
+
+    def _quantified(self, kind: str) -> Formula:
+        self.pos += 1
+        name = self._expect("id")
+        self._expect(",")
+        var = self._var(name, UNIVERSAL if kind == "all" else EXISTENTIAL)
+        outer = self.bound.get(name)
+        self.bound[name] = var
+        try:
+            sub = self._formula(0)
+        finally:
+            if outer is None:
+                del self.bound[name]
+            else:
+                self.bound[name] = outer
+        return ForAll(var, sub) if kind == "all" else Exists(var, sub)
+
+    def _args(self) -> tuple:
+        self.pos += 1
+        args = []
+        kinds = self.kinds
+        if kinds[self.pos] != ")":
+            args.append(self._term())
+            while kinds[self.pos] == ",":
+                self.pos += 1
+                args.append(self._term())
+        self._expect(")")
+        return tuple(args)
+
+    def _atom(self) -> Literal:
+        name = self.texts[self.pos]
+        self.pos += 1
+        args = self._args() if self.kinds[self.pos] == "(" else ()
+        kind = self.kinds[self.pos]
+        if kind == "eq" or kind == "neq":
+            # s = t and s ≠ t, the left side was read as an atom and is a term after all
+            self.pos += 1
+            if args:
+                left = Function(name, args)
+            else:
+                left = self.bound.get(name) or self._var(name, CONSTANT)
+            return Literal(EQUALITY, (left, self._term()), kind == "eq")
+        return Literal(name, args)
+
+    def _term(self) -> Any:
+        pos = self.pos
+        if self.kinds[pos] != "id":
+            raise ParseError(f"Expected a term but found {self.texts[pos]!r}")
+        name = self.texts[pos]
+        self.pos = pos + 1
+        if self.kinds[pos + 1] == "(":
+            return Function(name, self._args())
+        var = self.bound.get(name)
+        if var is not None:
+            return var
+        return self._var(name, CONSTANT)
+
+
+_CONTINUES = frozenset({"not", "and", "or", "imp", "iff", "all", "ex", ","})
+
+
+def parse_formula(text: str) -> Formula:
+    return _Parser().parse(*tokenize(text))
+
+def parse_stream(lines: Iterable[str]) -> Iterator[Formula]:
+    # One formula per line (or spread over several), blank lines and lines starting with # are skipped
+    parser = _Parser()
+    kinds: List[str] = []
+    texts: List[str] = []
+    depth = 0
+    lineno = 0
+    for lineno, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if not stripped or stripped[0] == "#":
+            continue
+        try:
+            k, t = tokenize(stripped)
+        except ParseError as e:
+            raise ParseError(f"line {lineno}: {e}") from None
+        depth += k.count("(") - k.count(")")
+        kinds += k
+        texts += t
+        # A formula continues on the next line while parentheses are open or it ends on a connective
+        if depth == 0 and kinds and kinds[-1] not in _CONTINUES:
+            try:
+                yield parser.parse(kinds, texts)
+            except ParseError as e:
+                raise ParseError(f"line {lineno}: {e}") from None
+            kinds, texts = [], []
+    if kinds:
+        raise ParseError(f"line {lineno}: unexpected end of input")
+
+def parse_file(path: str) -> Iterator[Formula]:
+    with open(path, encoding="utf-8") as f:
+        yield from parse_stream(f)
+
+def format_ascii(f: Formula) -> str:
+    text = str(f)
+    for symbol, ascii_symbol in _ASCII.items():
+        text = text.replace(symbol, ascii_symbol)
+    return text.replace("∀", "forall ").replace("∃", "exists ")
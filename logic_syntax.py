@@ -2,7 +2,17 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Tuple, Union, Any, Optional
 from structure import Literal
-    
+
+
+def _open_ended(f: Any) -> bool:
+    # A quantifier body runs to the end, so as a left operand it needs its own parentheses
+    while isinstance(f, Not):
+        f = f.sub
+    return isinstance(f, (ForAll, Exists))
+
+def _left(f: Any) -> str:
+    return f"({f})" if _open_ended(f) else str(f)
+
 @dataclass(frozen=True)
 class Var:
     name: str
@@ -38,28 +48,28 @@ class And:
     left: Formula
     right: Formula
     def __str__(self):
-        return f"({self.left} ∧ {self.right})"
+        return f"({_left(self.left)} ∧ {self.right})"
 
 @dataclass(frozen=True)
 class Or:
     left: Formula
     right: Formula
     def __str__(self):
-        return f"({self.left} ∨ {self.right})"
+        return f"({_left(self.left)} ∨ {self.right})"
 
 @dataclass(frozen=True)
 class Implies:
     provided: Formula
     then: Formula
     def __str__(self):
-        return f"({self.provided} → {self.then})"
+        return f"({_left(self.provided)} → {self.then})"
 
 @dataclass(frozen=True)
 class Iff:
     left: Formula
     right: Formula
     def __str__(self):
-        return f"({self.left} ↔ {self.right})"
+        return f"({_left(self.left)} ↔ {self.right})"
 
 @dataclass(frozen=True)
 class ForAll:
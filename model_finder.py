@@ -0,0 +1,336 @@
+from structure import *
+from logic_syntax import Function, Var
+from unification import is_variable
+from superposition import is_equation
+from dataclasses import dataclass
+from itertools import product
+from typing import Callable, Iterable, Optional
+
+
+# Flat literals, variables are small ints local to one clause:
+#   ("P", name, args, positive)          P(x1..xn)
+#   ("F", name, args, result, positive)  f(x1..xn) = y, constants are 0-ary functions
+#   ("E", x, y, positive)                x = y
+_PRED = "P"
+_FUN = "F"
+_EQ = "E"
+
+# Ground instances (or solver decisions) between calls to a stop callback
+_STOP_EVERY = 1024
+
+
+@dataclass(frozen=True)
+class Model:
+    # Domain {0, ..., size-1}. A constant is a 0-ary function, so its value is functions[name][()]
+    size: int
+    functions: Dict[str, Dict[Tuple[int, ...], int]]
+    predicates: Dict[str, FrozenSet[Tuple[int, ...]]]
+
+    def value(self, t: Any, env: Dict[Var, int]) -> int:
+        if is_variable(t):
+            return env[t]
+        if isinstance(t, Function):
+            return self.functions[t.name][tuple(self.value(a, env) for a in t.args)]
+        return self.functions[_name(t)][()]
+
+    def satisfies(self, clause: Clause, stop: Optional[Callable[[], None]] = None) -> bool:
+        # Every assignment of the clause's variables must make one literal true
+        variables = sorted({v for lit in clause.literals for v in _variables(lit.args)}, key=lambda v: v.name)
+        for i, values in enumerate(product(range(self.size), repeat=len(variables))):
+            if stop is not None and i % _STOP_EVERY == 0:
+                stop()
+            env = dict(zip(variables, values))
+            if not any(self._holds(lit, env) for lit in clause.literals):
+                return False
+        return True
+
+    def _holds(self, lit: Literal, env: Dict[Var, int]) -> bool:
+        if is_equation(lit):
+            truth = self.value(lit.args[0], env) == self.value(lit.args[1], env)
+        else:
+            truth = tuple(self.value(a, env) for a in lit.args) in self.predicates.get(lit.name, frozenset())
+        return truth == lit.positive
+
+    def __str__(self) -> str:
+        lines = [f"domain size {self.size}"]
+        for name in sorted(self.functions):
+            for args, value in sorted(self.functions[name].items()):
+                term = f"{name}({', '.join(map(str, args))})" if args else name
+                lines.append(f"{term} = {value}")
+        for name in sorted(self.predicates):
+            for args in sorted(self.predicates[name]):
+                lines.append(f"{name}({', '.join(map(str, args))})" if args else name)
+        return "\n".join(lines)
+
+
+def _name(t: Any) -> str:
+    return t.name if isinstance(t, Var) else str(t)
+
+def _variables(args: Iterable[Any]) -> Iterable[Var]:
+    stack = list(args)
+    while stack:
+        t = stack.pop()
+        if is_variable(t):
+            yield t
+        elif isinstance(t, Function):
+            stack.extend(t.args)
+
+
+class _Flattener:
+    # One clause at a time: every non-variable subterm becomes a fresh variable v together with the
+    # literal f(...) ≠ v, so that grounding only ever looks up one table entry per literal
+    def __init__(self):
+        self.vars: Dict[Any, int] = {}
+        self.literals: list[tuple] = []
+        self.defined: Dict[Any, int] = {}
+
+    def var(self, v: Var) -> int:
+        i = self.vars.get(v)
+        if i is None:
+            i = self.vars[v] = len(self.vars) + len(self.defined)
+        return i
+
+    def term(self, t: Any) -> int:
+        if is_variable(t):
+            return self.var(t)
+        v = self.defined.get(t)
+        if v is None:
+            name, args = self.application(t)
+            v = self.defined[t] = len(self.vars) + len(self.defined)
+            self.literals.append((_FUN, name, args, v, False))
+        return v
+
+    def application(self, t: Any) -> tuple[str, tuple]:
+        if isinstance(t, Function):
+            return t.name, tuple(self.term(a) for a in t.args)
+        return _name(t), ()
+
+    def literal(self, lit: Literal) -> None:
+        if is_equation(lit):
+            s, t = lit.args
+            if is_variable(s):
+                s, t = t, s
+            if is_variable(s):
+                self.literals.append((_EQ, self.var(s), self.var(t), lit.positive))
+            else:
+                name, args = self.application(s)
+                self.literals.append((_FUN, name, args, self.term(t), lit.positive))
+        else:
+            self.literals.append((_PRED, lit.name, tuple(self.term(a) for a in lit.args), lit.positive))
+
+def flatten(clause: Clause) -> tuple[int, list[tuple]]:
+    # Returns the number of variables and the flat literals
+    f = _Flattener()
+    for lit in clause.literals:
+        f.literal(lit)
+    return len(f.vars) + len(f.defined), f.literals
+
+
+class _Grounding:
+    # Propositional encoding for one domain size, atoms are numbered from 1 like DIMACS. The number
+    # of instances grows as size ** variables, so stop gets called along the way.
+    def __init__(self, size: int, stop: Optional[Callable[[], None]] = None):
+        self.size = size
+        self.atoms: Dict[tuple, int] = {}
+        self.clauses: list[list[int]] = []
+        self.stop = stop
+        self.instances = 0
+
+    def _tick(self) -> None:
+        self.instances += 1
+        if self.stop is not None and self.instances % _STOP_EVERY == 0:
+            self.stop()
+
+    def atom(self, key: tuple) -> int:
+        a = self.atoms.get(key)
+        if a is None:
+            a = self.atoms[key] = len(self.atoms) + 1
+        return a
+
+    def functions(self, signature: Dict[str, int], constants: List[str]) -> None:
+        n = self.size
+        for name, arity in signature.items():
+            for args in product(range(n), repeat=arity):
+                self._tick()
+                values = [self.atom((_FUN, name, args, e)) for e in range(n)]
+                self.clauses.append(values)
+                for i in range(n):
+                    for j in range(i + 1, n):
+                        self.clauses.append([-values[i], -values[j]])
+        # Symmetry breaking: number the elements in order of the first constant naming them, so the
+        # i-th constant is at most i and is only i when the constant before it takes i - 1
+        for i, name in enumerate(constants):
+            for e in range(i + 1, n):
+                self.clauses.append([-self.atom((_FUN, name, (), e))])
+            for e in range(1, min(i, n - 1) + 1):
+                self.clauses.append([-self.atom((_FUN, name, (), e))] +
+                                    [self.atom((_FUN, other, (), e - 1)) for other in constants[:i]])
+
+    def ground(self, nvars: int, literals: list[tuple]) -> None:
+        for values in product(range(self.size), repeat=nvars):
+            self._tick()
+            clause = []
+            for lit in literals:
+                kind = lit[0]
+                if kind == _EQ:
+                    if (values[lit[1]] == values[lit[2]]) == lit[3]:
+                        break
+                    continue
+                if kind == _PRED:
+                    a = self.atom((_PRED, lit[1], tuple(values[i] for i in lit[2])))
+                    clause.append(a if lit[3] else -a)
+                else:
+                    a = self.atom((_FUN, lit[1], tuple(values[i] for i in lit[2]), values[lit[3]]))
+                    clause.append(a if lit[4] else -a)
+            else:
+                self.clauses.append(clause)
+
+    def predicates(self, predicates: Dict[str, int]) -> None:
+        # Every table entry gets an atom, even when no clause constrains it
+        for name, arity in predicates.items():
+            for args in product(range(self.size), repeat=arity):
+                self._tick()
+                self.atom((_PRED, name, args))
+
+
+def _solve(nvars: int, clauses: list[list[int]], stop: Optional[Callable[[], None]] = None) -> Optional[list[int]]:
+    # DPLL with two watched literals and chronological backtracking. Returns the value
+    # (1 or -1) of every atom, index 0 unused, or None when the clauses are unsatisfiable.
+    assign = [0] * (nvars + 1)
+    watches: Dict[int, list[int]] = {}
+    trail: list[int] = []
+    units = []
+    work = []
+    for c in clauses:
+        c = list(dict.fromkeys(c))
+        if not c:
+            return None
+        if len(c) == 1:
+            units.append(c[0])
+            continue
+        watches.setdefault(c[0], []).append(len(work))
+        watches.setdefault(c[1], []).append(len(work))
+        work.append(c)
+
+    def value(lit: int) -> int:
+        v = assign[abs(lit)]
+        return v if lit > 0 else -v
+
+    def enqueue(lit: int) -> bool:
+        v = value(lit)
+        if v:
+            return v > 0
+        assign[abs(lit)] = 1 if lit > 0 else -1
+        trail.append(lit)
+        return True
+
+    def propagate(head: int) -> bool:
+        while head < len(trail):
+            false_lit = -trail[head]
+            head += 1
+            ws = watches.get(false_lit)
+            if not ws:
+                continue
+            kept = 0
+            k = 0
+            conflict = False
+            while k < len(ws):
+                ci = ws[k]
+                k += 1
+                c = work[ci]
+                if c[0] == false_lit:
+                    c[0], c[1] = c[1], c[0]
+                if value(c[0]) > 0:
+                    ws[kept] = ci
+                    kept += 1
+                    continue
+                for m in range(2, len(c)):
+                    if value(c[m]) >= 0:
+                        c[1], c[m] = c[m], c[1]
+                        watches.setdefault(c[1], []).append(ci)
+                        break
+                else:
+                    ws[kept] = ci
+                    kept += 1
+                    if not enqueue(c[0]):
+                        conflict = True
+                        while k < len(ws):
+                            ws[kept] = ws[k]
+                            kept += 1
+                            k += 1
+            del ws[kept:]
+            if conflict:
+                return False
+        return True
+
+    for lit in units:
+        if not enqueue(lit):
+            return None
+    if not propagate(0):
+        return None
+    decisions: list[tuple[int, int, bool]] = []   # (trail length before, literal, already flipped)
+    next_var = 1
+    steps = 0
+    while True:
+        while next_var <= nvars and assign[next_var]:
+            next_var += 1
+        if next_var > nvars:
+            return assign
+        steps += 1
+        if stop is not None and steps % _STOP_EVERY == 0:
+            stop()
+        decisions.append((len(trail), -next_var, False))
+        enqueue(-next_var)
+        ok = propagate(len(trail) - 1)
+        while not ok:
+            while decisions and decisions[-1][2]:
+                decisions.pop()
+            if not decisions:
+                return None
+            start, lit, _ = decisions.pop()
+            for undone in trail[start:]:
+                assign[abs(undone)] = 0
+            del trail[start:]
+            next_var = min(next_var, abs(lit))
+            decisions.append((start, -lit, True))
+            enqueue(-lit)
+            ok = propagate(start)
+            if ok:
+                next_var = 1
+
+
+def find_model(clauses: Iterable[Clause], max_size: int = 4, min_size: int = 1,
+               stop: Optional[Callable[[], None]] = None) -> Optional[Model]:
+    # MACE style: flatten once, then ground and solve for domain sizes min_size..max_size.
+    # A model of the axioms plus the negated goal is a countermodel for the goal. stop is called
+    # now and then and can raise to abandon the search.
+    flat = [flatten(c) for c in clauses]
+    signature: Dict[str, int] = {}
+    predicates: Dict[str, int] = {}
+    for _, literals in flat:
+        for lit in literals:
+            if lit[0] == _FUN:
+                signature.setdefault(lit[1], len(lit[2]))
+            elif lit[0] == _PRED:
+                predicates.setdefault(lit[1], len(lit[2]))
+    constants = sorted(name for name, arity in signature.items() if arity == 0)
+    for size in range(max(1, min_size), max_size + 1):
+        grounding = _Grounding(size, stop)
+        grounding.functions(signature, constants)
+        for nvars, literals in flat:
+            grounding.ground(nvars, literals)
+        grounding.predicates(predicates)
+        assignment = _solve(len(grounding.atoms), grounding.clauses, stop)
+        if assignment is None:
+            continue
+        functions: Dict[str, Dict[Tuple[int, ...], int]] = {name: {} for name in signature}
+        holds: Dict[str, set] = {name: set() for name in predicates}
+        for key, a in grounding.atoms.items():
+            if assignment[a] <= 0:
+                continue
+            if key[0] == _FUN:
+                functions[key[1]][key[2]] = key[3]
+            else:
+                holds[key[1]].add(key[2])
+        return Model(size, functions, {name: frozenset(rows) for name, rows in holds.items()})
+    return None
@@ -0,0 +1,134 @@
+from structure import *
+from unification import Substitution, substitute, clause_variables
+from array import array
+from dataclasses import dataclass
+from typing import Optional
+
+
+INPUT = 0
+GOAL = 1
+RESOLVE = 2
+FACTOR = 3
+SIMPLIFIED = 4
+SUPERPOSE = 5
+EQ_RESOLVE = 6
+EQ_FACTOR = 7
+DEMODULATE = 8
+
+RULE_NAMES = ("input", "goal", "resolve", "factor", "simplified", "superpose", "eq_resolve", "eq_factor",
+              "demodulate")
+
+_NONE = -1
+
+
+@dataclass(frozen=True)
+class ProofStep:
+    id: int
+    clause: Clause
+    rule: str
+    parents: Tuple[int, ...]
+    unifier: Optional[Substitution] = None
+
+    def __str__(self) -> str:
+        body = str(self.clause) if self.clause.literals else "□"
+        line = f"{self.id}. {body}    [{self.rule}"
+        if self.parents:
+            line += " " + ", ".join(map(str, self.parents))
+        line += "]"
+        if self.unifier:
+            line += " {" + ", ".join(f"{v} ↦ {t}" for v, t in self.unifier.items()) + "}"
+        return line
+
+
+@dataclass(frozen=True)
+class Proof:
+    steps: Tuple[ProofStep, ...]
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __str__(self) -> str:
+        return "\n".join(map(str, self.steps))
+
+
+class Provenance:
+    # Side table of how every retained clause was derived, kept as flat int arrays indexed by clause id.
+    # Each id holds one reference while the clause is live and one per live child, the entry is dropped
+    # once nothing can reach it from a live clause anymore.
+    def __init__(self):
+        self.rule = bytearray()
+        self.left = array("q")
+        self.right = array("q")
+        self.refs = array("q")
+        self.clauses: dict[int, Clause] = {}
+        self.unifiers: dict[int, Substitution] = {}
+
+    def record(self, cid: int, clause: Clause, rule: int, left: int = _NONE, right: int = _NONE,
+               unifier: Optional[Substitution] = None) -> None:
+        # Clause ids are handed out densely by the search, so the arrays grow by one here
+        while len(self.refs) <= cid:
+            self.rule.append(INPUT)
+            self.left.append(_NONE)
+            self.right.append(_NONE)
+            self.refs.append(0)
+        self.rule[cid] = rule
+        self.left[cid] = left
+        self.right[cid] = right
+        self.refs[cid] = 1
+        self.clauses[cid] = clause
+        if unifier:
+            self.unifiers[cid] = unifier
+        for p in {left, right}:
+            if p != _NONE:
+                self.refs[p] += 1
+
+    def release(self, cid: int) -> None:
+        stack = [cid]
+        while stack:
+            i = stack.pop()
+            self.refs[i] -= 1
+            if self.refs[i] > 0:
+                continue
+            del self.clauses[i]
+            self.unifiers.pop(i, None)
+            for p in {self.left[i], self.right[i]}:
+                if p != _NONE:
+                    stack.append(p)
+
+    def __len__(self) -> int:
+        return len(self.clauses)
+
+    def parents(self, cid: int) -> Tuple[int, ...]:
+        left, right = self.left[cid], self.right[cid]
+        if left == _NONE:
+            return ()
+        if right == _NONE or right == left:
+            return (left,)
+        return (left, right)
+
+    def _unifier(self, cid: int) -> Optional[Substitution]:
+        theta = self.unifiers.get(cid)
+        if not theta:
+            return None
+        # Only report the bindings of variables that occur in the parents, fully resolved
+        seen = set()
+        for p in self.parents(cid):
+            seen |= clause_variables(self.clauses[p])
+        resolved = {v: substitute(v, theta) for v in theta if v in seen}
+        return resolved or None
+
+    def extract(self, cid: int) -> Proof:
+        # Walk back from the empty clause keeping only its ancestors, parents always have smaller ids
+        needed = set()
+        stack = [cid]
+        while stack:
+            i = stack.pop()
+            if i in needed:
+                continue
+            needed.add(i)
+            stack.extend(self.parents(i))
+        steps = tuple(
+            ProofStep(i, self.clauses[i], RULE_NAMES[self.rule[i]], self.parents(i), self._unifier(i))
+            for i in sorted(needed)
+        )
+        return Proof(steps)
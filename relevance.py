@@ -0,0 +1,46 @@
+from structure import *
+from typing import Iterable, Optional
+
+
+def relevant_clauses(kb: KB, support: Iterable[Clause], max_depth: Optional[int] = None) -> List[Clause]:
+    return relevance_filter(kb, support, max_depth)[0]
+
+def relevance_filter(kb: KB, support: Iterable[Clause],
+                     max_depth: Optional[int] = None) -> tuple[List[Clause], bool]:
+    # Predicate reachability from the support clauses (usually the negated goal): a KB clause is
+    # relevant when it has a literal that can resolve with a reachable literal, and then all of its
+    # other literals become reachable too. Without a depth bound this keeps every clause that a set
+    # of support refutation could ever touch. The flag says whether the depth bound cut off reachable
+    # clauses. Even without a cut, saturating the selection only shows that the goal does not follow
+    # when the clauses left out are consistent, which the filter cannot tell.
+    reached: set[tuple[str, bool]] = set()
+    frontier: list[tuple[str, bool]] = []
+    for clause in support:
+        for lit in clause.literals:
+            key = (lit.name, lit.positive)
+            if key not in reached:
+                reached.add(key)
+                frontier.append(key)
+
+    selected: list[Clause] = []
+    # By value, a ShardedKB hands out fresh copies of a clause on every lookup
+    seen: set[Clause] = set()
+    depth = 0
+    while frontier and (max_depth is None or depth < max_depth):
+        next_frontier = []
+        for name, positive in frontier:
+            for clause in kb.clauses_with(name, not positive):
+                if clause in seen:
+                    continue
+                seen.add(clause)
+                selected.append(clause)
+                for lit in clause.literals:
+                    key = (lit.name, lit.positive)
+                    if key not in reached:
+                        reached.add(key)
+                        next_frontier.append(key)
+        frontier = next_frontier
+        depth += 1
+    cut = any(clause not in seen for name, positive in frontier
+              for clause in kb.clauses_with(name, not positive))
+    return selected, cut
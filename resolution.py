@@ -1,15 +1,643 @@
 from structure import *
+from logic_syntax import Function
+from unification import Substitution, unify_literals, substitute_clause, rename_clause, subsumes, match, term_weight
+from proof import Proof, Provenance, INPUT, GOAL, RESOLVE, FACTOR, SIMPLIFIED, SUPERPOSE, EQ_RESOLVE, EQ_FACTOR, DEMODULATE
+from relevance import relevance_filter
+from model_finder import Model, find_model
+from simplify import simplify, is_tautology
+from superposition import (EQUALITY, Demodulators, has_equality, is_equation, is_trivial, symbol, literal_subterms,
+                           superpositions, equality_resolvents, equality_factors)
+from dataclasses import dataclass, field, asdict
+from itertools import count
+from enum import Enum
+from typing import Callable, Optional, TextIO
+import asyncio
+import functools
+import heapq
+import threading
+import time
+import tracemalloc
 
-def resolve(c1: Clause, c2: Clause) -> List[Clause]:
-    #Implement
-    pass
 
-def refutation_proof(kb: KB, goal: Clause) -> bool:
-    #Implement
-    pass
+@dataclass
+class ProofStats:
+    input_clauses: int = 0
+    filtered: int = 0       # KB clauses dropped by the relevance filter
+    simplified: int = 0     # clauses removed by the preprocessing pipeline
+    unit_deleted: int = 0   # literals removed from new clauses by active unit clauses
+    generated: int = 0
+    kept: int = 0
+    selected: int = 0
+    tautologies: int = 0
+    subsumed: int = 0       # forward subsumption, new clause dropped
+    deleted: int = 0        # backward subsumption, active clause removed
+    unify_attempts: int = 0
+    unify_failures: int = 0
+    index_lookups: int = 0
+    index_candidates: int = 0
+    index_hits: int = 0
+    rewrites: int = 0       # demodulation steps on new and given clauses
+    rewritten: int = 0      # active clauses simplified by a new demodulator and sent back to passive
+    phase_times: Dict[str, float] = field(default_factory=dict)
+    peak_memory: Optional[int] = None  # bytes, only filled when track_memory is on
+
+    @property
+    def index_hit_rate(self) -> float:
+        return self.index_hits / self.index_candidates if self.index_candidates else 0.0
+
+    @property
+    def unify_failure_rate(self) -> float:
+        return self.unify_failures / self.unify_attempts if self.unify_attempts else 0.0
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        self.phase_times[phase] = self.phase_times.get(phase, 0.0) + seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["index_hit_rate"] = self.index_hit_rate
+        d["unify_failure_rate"] = self.unify_failure_rate
+        return d
+
+
+class ProofStatus(Enum):
+    PROVED = "proved"
+    DISPROVED = "disproved"   # the clause set saturated without the empty clause
+    UNKNOWN = "unknown"       # a limit or cancellation stopped the search, or a restricted one saturated
+
+
+@dataclass(frozen=True)
+class ProofLimits:
+    max_seconds: Optional[float] = None
+    max_generated: Optional[int] = None
+    max_kept: Optional[int] = None     # passive + active clauses held at once
+    max_memory: Optional[int] = None   # bytes traced by tracemalloc during the search
+    memory_check_every: int = 64       # given clauses between memory checks
+
+
+class CancelToken:
+    # Thread safe flag, set it from another thread (or prove_async) to stop a running search
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+@dataclass
+class ProofResult:
+    status: ProofStatus
+    stats: ProofStats
+    reason: Optional[str] = None  # which limit stopped an UNKNOWN search
+    proof: Optional[Proof] = None  # only filled for PROVED results when record_proof is on
+    model: Optional[Model] = None  # countermodel behind a DISPROVED result found by the model finder
+
+    def __bool__(self) -> bool:
+        return self.status is ProofStatus.PROVED
+
+
+class _LimitReached(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def clause_weight(clause: Clause) -> int:
+    return sum(1 + sum(term_weight(a) for a in lit.args) for lit in clause.literals)
+
+
+def _resolve_pair(c1: Clause, l1: Literal, c2: Clause, l2: Literal,
+                  stats: Optional[ProofStats] = None) -> Optional[tuple[Clause, Substitution]]:
+    # c1 and c2 must not share variables
+    if stats is not None:
+        stats.unify_attempts += 1
+    theta = unify_literals(l1, l2)
+    if theta is None:
+        if stats is not None:
+            stats.unify_failures += 1
+        return None
+    rest = (c1.literals - {l1}) | (c2.literals - {l2})
+    return substitute_clause(Clause(frozenset(rest)), theta), theta
+
+def resolve(c1: Clause, c2: Clause, stats: Optional[ProofStats] = None) -> List[Clause]:
+    c2 = rename_clause(c2)
+    resolvents = []
+    for l1 in c1.literals:
+        for l2 in c2.literals:
+            if l1.positive != l2.positive and l1.name == l2.name:
+                r = _resolve_pair(c1, l1, c2, l2, stats)
+                if r is not None:
+                    resolvents.append(r[0])
+    return resolvents
+
+def factors(clause: Clause, stats: Optional[ProofStats] = None) -> List[Clause]:
+    return [c for c, _ in _factors(clause, stats)]
+
+def _factors(clause: Clause, stats: Optional[ProofStats] = None) -> List[tuple[Clause, Substitution]]:
+    lits = list(clause.literals)
+    result = []
+    for i in range(len(lits)):
+        for j in range(i + 1, len(lits)):
+            a, b = lits[i], lits[j]
+            if a.positive != b.positive or a.name != b.name:
+                continue
+            if stats is not None:
+                stats.unify_attempts += 1
+            theta = unify_literals(a, b)
+            if theta is None:
+                if stats is not None:
+                    stats.unify_failures += 1
+                continue
+            result.append((substitute_clause(clause, theta), theta))
+    return result
+
+def negate_goal(goal: Clause) -> List[Clause]:
+    # ¬(L1 ∨ ... ∨ Ln) ≡ ¬L1 ∧ ... ∧ ¬Ln, goal variables are read existentially
+    return [Clause(frozenset({lit.negate()})) for lit in goal.literals]
+
+
+class _Search:
+    # Given-clause loop: passive is a weight ordered heap, active is indexed by (predicate, sign)
+    def __init__(self, stats: ProofStats, trace: Optional[TextIO] = None, trace_every: int = 1,
+                 limits: Optional[ProofLimits] = None, cancel: Optional[CancelToken] = None,
+                 record_proof: bool = False, equality: bool = False):
+        self.stats = stats
+        self.trace = trace
+        self.trace_every = max(1, trace_every)
+        self.limits = limits or ProofLimits()
+        self.cancel = cancel
+        self.deadline = None
+        if self.limits.max_seconds is not None:
+            self.deadline = time.perf_counter() + self.limits.max_seconds
+        self.memory_baseline = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        self._ids = count()
+        self.passive: list[tuple[int, int, Clause]] = []
+        self.active: dict[int, Clause] = {}
+        self.index: dict[tuple[str, bool], dict[int, Clause]] = {}
+        self.units: dict[tuple[str, bool], dict[int, Literal]] = {}
+        self.provenance = Provenance() if record_proof else None
+        # Equality: superposition partners are found through the symbols occurring in active clauses
+        # and the symbols their positive equations rewrite from, unit equations also demodulate
+        self.equality = equality
+        self.terms: dict[tuple[str, int], dict[int, Clause]] = {}
+        self.equations: dict[tuple[str, int], dict[int, Clause]] = {}
+        self.demodulators = Demodulators()
+
+    def _trivial(self, clause: Clause) -> bool:
+        return is_tautology(clause) or (self.equality and is_trivial(clause))
+
+    def add_input(self, clause: Clause, rule: int = INPUT) -> None:
+        self.stats.input_clauses += 1
+        if self._trivial(clause):
+            self.stats.tautologies += 1
+            return
+        self._push(clause, (rule, -1, -1, None))
+
+    def add_axiom(self, clause: Clause) -> None:
+        # Set of support: axioms skip the passive queue, so they only take part in inferences
+        # with given clauses that descend from the goal
+        self.stats.input_clauses += 1
+        if self._trivial(clause):
+            self.stats.tautologies += 1
+            return
+        clause = rename_clause(clause)
+        if not clause.literals:
+            self._push(clause, (INPUT, -1, -1, None))
+            return
+        cid = self._record(clause, (INPUT, -1, -1, None))
+        self._activate(cid, clause)
+        self.stats.kept += 1
+
+    def _record(self, clause: Clause, origin: tuple) -> int:
+        cid = next(self._ids)
+        if self.provenance is not None:
+            rule, left, right, theta = origin
+            self.provenance.record(cid, clause, rule, left, right, theta)
+        return cid
+
+    def _release(self, cid: int) -> None:
+        if self.provenance is not None:
+            self.provenance.release(cid)
+
+    def _push(self, clause: Clause, origin: tuple) -> int:
+        clause = rename_clause(clause)
+        cid = self._record(clause, origin)
+        heapq.heappush(self.passive, (clause_weight(clause), cid, clause))
+        self.stats.kept += 1
+        return cid
+
+    def _check_limits(self) -> None:
+        limits, stats = self.limits, self.stats
+        if self.cancel is not None and self.cancel.cancelled:
+            raise _LimitReached("cancelled")
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise _LimitReached("time")
+        if limits.max_generated is not None and stats.generated > limits.max_generated:
+            raise _LimitReached("generated")
+        if limits.max_kept is not None and len(self.passive) + len(self.active) > limits.max_kept:
+            raise _LimitReached("kept")
+        if (limits.max_memory is not None and stats.selected % limits.memory_check_every == 0
+                and tracemalloc.get_traced_memory()[0] - self.memory_baseline > limits.max_memory):
+            raise _LimitReached("memory")
+
+    def _add_new(self, clause: Clause, origin: tuple) -> None:
+        self.stats.generated += 1
+        if self._trivial(clause):
+            self.stats.tautologies += 1
+            return
+        if self._forward_subsumed(clause):
+            self.stats.subsumed += 1
+            return
+        self._push(clause, origin)
+
+    def _candidates(self, clause: Clause) -> dict[int, Clause]:
+        found = {}
+        for lit in clause.literals:
+            bucket = self.index.get((lit.name, lit.positive))
+            if bucket:
+                found.update(bucket)
+        return found
+
+    def _forward_subsumed(self, clause: Clause) -> bool:
+        return any(subsumes(c, clause) for c in self._candidates(clause).values())
+
+    def _backward_subsume(self, given: Clause) -> None:
+        if not given.literals:
+            return
+        first = next(iter(given.literals))
+        bucket = self.index.get((first.name, first.positive))
+        if not bucket:
+            return
+        for cid, c in list(bucket.items()):
+            if subsumes(given, c):
+                self._deactivate(cid)
+                self._release(cid)
+                self.stats.deleted += 1
+
+    def _activate(self, cid: int, clause: Clause) -> None:
+        self.active[cid] = clause
+        for lit in clause.literals:
+            self.index.setdefault((lit.name, lit.positive), {})[cid] = clause
+            if len(clause.literals) == 1:
+                self.units.setdefault((lit.name, lit.positive), {})[cid] = lit
+        if self.equality:
+            for key in self._term_keys(clause):
+                self.terms.setdefault(key, {})[cid] = clause
+            for key in self._equation_keys(clause):
+                self.equations.setdefault(key, {})[cid] = clause
+            self.demodulators.add(cid, clause)
+
+    def _term_keys(self, clause: Clause) -> set:
+        return {symbol(u) for lit in clause.literals for _, u in literal_subterms(lit)}
+
+    def _equation_keys(self, clause: Clause) -> set:
+        # A variable side rewrites into any symbol, it is filed under None
+        return {symbol(side) for lit in clause.literals if lit.positive and is_equation(lit)
+                for side in lit.args}
+
+    def _deactivate(self, cid: int) -> None:
+        clause = self.active.pop(cid)
+        for lit in clause.literals:
+            bucket = self.index.get((lit.name, lit.positive))
+            if bucket is not None:
+                bucket.pop(cid, None)
+            units = self.units.get((lit.name, lit.positive))
+            if units is not None:
+                units.pop(cid, None)
+        if self.equality:
+            for table, keys in ((self.terms, self._term_keys(clause)), (self.equations, self._equation_keys(clause))):
+                for key in keys:
+                    bucket = table.get(key)
+                    if bucket is not None:
+                        bucket.pop(cid, None)
+            self.demodulators.remove(cid)
+
+    def _demodulate(self, clause: Clause, origin: tuple) -> tuple[Clause, tuple, List[int]]:
+        # Rewrites to normal form with the active unit equations, recording every step like _unit_simplify
+        intermediates = []
+        while True:
+            step = self.demodulators.rewrite_once(clause)
+            if step is None:
+                return clause, origin, intermediates
+            new, did, theta = step
+            if self.provenance is not None:
+                iid = self._record(clause, origin)
+                intermediates.append(iid)
+                origin = (DEMODULATE, iid, did, theta)
+            clause = new
+            self.stats.rewrites += 1
+
+    def _demodulate_given(self, cid: int, given: Clause) -> tuple[int, Clause]:
+        # Demodulators activated since given was generated may apply now, every step gets an id
+        while True:
+            step = self.demodulators.rewrite_once(given)
+            if step is None:
+                return cid, given
+            new, did, theta = step
+            nid = self._record(new, (DEMODULATE, cid, did, theta))
+            self._release(cid)
+            cid, given = nid, new
+            self.stats.rewrites += 1
+
+    def _backward_demodulate(self, did: int) -> None:
+        # Active clauses the new unit equation rewrites leave the active set, their rewritten
+        # versions go back to passive
+        for key in self.demodulators.symbols(did):
+            for pid, c in list(self.terms.get(key, {}).items()):
+                if pid == did or pid not in self.active:
+                    continue
+                step = self.demodulators.rewrite_once(c, only=did)
+                if step is None:
+                    continue
+                self._deactivate(pid)
+                self.stats.rewritten += 1
+                self._add_new(step[0], (DEMODULATE, pid, did, step[2]))
+                self._release(pid)
+
+    def _unit_simplify(self, clause: Clause, origin: tuple) -> tuple[Clause, tuple, List[int]]:
+        # Unit deletion against the active unit clauses. With proofs on, every deleted literal is a
+        # resolution step, so the intermediate clauses get ids the caller releases afterwards
+        intermediates = []
+        changed = True
+        while changed and clause.literals:
+            changed = False
+            for lit in clause.literals:
+                units = self.units.get((lit.name, not lit.positive))
+                if not units:
+                    continue
+                for uid, unit in units.items():
+                    theta = match(unit.args, lit.args)
+                    if theta is None:
+                        continue
+                    if self.provenance is not None:
+                        # Recorded as a resolution step, so the unit is renamed apart first: a match
+                        # against a clause sharing its variables can bind x to a term holding x
+                        [renamed] = rename_clause(Clause(frozenset({unit}))).literals
+                        theta = match(renamed.args, lit.args)
+                        iid = self._record(clause, origin)
+                        intermediates.append(iid)
+                        origin = (RESOLVE, iid, uid, theta)
+                    clause = Clause(clause.literals - {lit})
+                    self.stats.unit_deleted += 1
+                    changed = True
+                    break
+                if changed:
+                    break
+        return clause, origin, intermediates
+
+    def _infer(self, cid: int, given: Clause) -> List[tuple[Clause, tuple]]:
+        # Each inference comes back with its origin: (rule, left parent, right parent, unifier)
+        stats = self.stats
+        new = [(c, (FACTOR, cid, -1, theta)) for c, theta in _factors(given, stats)]
+        for lit in given.literals:
+            stats.index_lookups += 1
+            bucket = self.index.get((lit.name, not lit.positive))
+            if not bucket:
+                continue
+            for pid, partner in list(bucket.items()):
+                stats.index_candidates += 1
+                if pid == cid:
+                    partner = rename_clause(partner)
+                hit = False
+                for other in partner.literals:
+                    if other.positive == lit.positive or other.name != lit.name:
+                        continue
+                    r = _resolve_pair(given, lit, partner, other, stats)
+                    if r is not None:
+                        hit = True
+                        new.append((r[0], (RESOLVE, cid, pid, r[1])))
+                if hit:
+                    stats.index_hits += 1
+        if self.equality:
+            new.extend(self._infer_equality(cid, given))
+        return new
+
+    def _infer_equality(self, cid: int, given: Clause) -> List[tuple[Clause, tuple]]:
+        new = [(c, (EQ_RESOLVE, cid, -1, theta)) for c, theta in equality_resolvents(given)]
+        new += [(c, (EQ_FACTOR, cid, -1, theta)) for c, theta in equality_factors(given)]
+        # given rewrites into active clauses (itself included, renamed apart)
+        for eq in given.literals:
+            if not eq.positive or not is_equation(eq):
+                continue
+            partners = {}
+            for side in eq.args:
+                key = symbol(side)
+                partners.update(self.terms.get(key, {}) if key is not None else self.active)
+            for pid, partner in partners.items():
+                if pid == cid:
+                    partner = rename_clause(partner)
+                new += [(c, (SUPERPOSE, cid, pid, theta)) for c, theta in superpositions(given, eq, partner)]
+        # active equations rewrite into given
+        partners = dict(self.equations.get(None, {}))
+        for key in self._term_keys(given):
+            partners.update(self.equations.get(key, {}))
+        partners.pop(cid, None)
+        for pid, partner in partners.items():
+            for eq in partner.literals:
+                if eq.positive and is_equation(eq):
+                    new += [(c, (SUPERPOSE, pid, cid, theta)) for c, theta in superpositions(partner, eq, given)]
+        return new
+
+    def _write_trace(self, cid: int, weight: int, given: Clause) -> None:
+        if self.trace is not None and self.stats.selected % self.trace_every == 0:
+            self.trace.write(f"{self.stats.selected}\t{cid}\t{weight}\t{given}\n")
+
+    def run(self) -> Optional[int]:
+        # Returns the id of the empty clause, or None once the clause set saturates
+        stats = self.stats
+        clock = time.perf_counter
+        while self.passive:
+            self._check_limits()
+            t0 = clock()
+            weight, cid, given = heapq.heappop(self.passive)
+            stats.selected += 1
+            self._write_trace(cid, weight, given)
+            t1 = clock()
+            stats.add_time("select", t1 - t0)
+
+            if not given.literals:
+                return cid
+            if self.equality and len(self.demodulators):
+                cid, given = self._demodulate_given(cid, given)
+                if self._trivial(given):
+                    stats.tautologies += 1
+                    self._release(cid)
+                    continue
+                if not given.literals:
+                    return cid
+            if self._forward_subsumed(given):
+                stats.subsumed += 1
+                self._release(cid)
+                stats.add_time("simplify", clock() - t1)
+                continue
+            self._backward_subsume(given)
+            self._activate(cid, given)
+            if self.equality and self.demodulators.symbols(cid):
+                self._backward_demodulate(cid)
+            t2 = clock()
+            stats.add_time("simplify", t2 - t1)
+
+            new = self._infer(cid, given)
+            t3 = clock()
+            stats.add_time("infer", t3 - t2)
+
+            for c, origin in new:
+                # One given clause can have many children, each costing a subsumption check
+                self._check_limits()
+                demodulated = []
+                if self.equality:
+                    c, origin, demodulated = self._demodulate(c, origin)
+                c, origin, intermediates = self._unit_simplify(c, origin)
+                intermediates = demodulated + intermediates
+                if not c.literals:
+                    stats.generated += 1
+                    stats.add_time("simplify", clock() - t3)
+                    return self._record(c, origin)
+                self._add_new(c, origin)
+                for iid in intermediates:
+                    self._release(iid)
+            stats.add_time("simplify", clock() - t3)
+            self._check_limits()
+        return None
+
+    def proof(self, cid: int) -> Optional[Proof]:
+        return self.provenance.extract(cid) if self.provenance is not None else None
+
+
+def prove(kb: KB, goal: Clause, limits: Optional[ProofLimits] = None,
+          cancel: Optional[CancelToken] = None, stats: Optional[ProofStats] = None,
+          trace: Optional[TextIO] = None, trace_every: int = 1,
+          track_memory: bool = False, record_proof: bool = False,
+          relevance: bool = False, relevance_depth: Optional[int] = None,
+          set_of_support: bool = False, preprocess: bool = False,
+          equality: Optional[bool] = None, model_size: int = 0) -> ProofResult:
+    # relevance drops KB clauses the negated goal cannot reach, set_of_support only lets
+    # clauses derived from the goal be selected as given clauses, preprocess runs the
+    # simplify pipeline over the axioms and the negated goal before the search.
+    # equality turns on superposition and demodulation for "=" literals, None means
+    # whenever the KB or the goal has one, and switches off relevance and set_of_support.
+    # model_size > 0 first looks for a finite model of the KB and the negated goal with up to
+    # that many elements, which answers DISPROVED where the search would never saturate.
+    stats = ProofStats() if stats is None else stats
+    # A memory limit can only be enforced while tracemalloc is running
+    track_memory = track_memory or (limits is not None and limits.max_memory is not None)
+    started_tracing = False
+    if track_memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+    try:
+        t0 = time.perf_counter()
+        support = negate_goal(goal)
+        # Only read the whole KB when the search needs it, on a ShardedKB that fetches every shard
+        axioms = None
+        if equality is None:
+            equality = (has_equality(support) or has_equality(kb.clauses_with(EQUALITY, True))
+                        or has_equality(kb.clauses_with(EQUALITY, False)))
+        search = _Search(stats, trace, trace_every, limits, cancel, record_proof, equality)
+        if model_size > 0:
+            # Before relevance and preprocessing, so the model satisfies the whole KB
+            axioms = kb.clauses
+            model = find_model(axioms + support, model_size, stop=search._check_limits)
+            stats.add_time("model", time.perf_counter() - t0)
+            if model is not None:
+                return ProofResult(ProofStatus.DISPROVED, stats, model=model)
+            t0 = time.perf_counter()
+        # Predicate reachability says nothing about what an equation can rewrite, so no filtering then
+        cut = filtered = False
+        if relevance and not equality:
+            axioms, cut = relevance_filter(kb, support, relevance_depth)
+            stats.filtered = len(kb) - len(axioms)
+            filtered = stats.filtered > 0
+        elif axioms is None:
+            axioms = kb.clauses
+        rewritten = []
+        if preprocess:
+            axioms, support, rewritten = _preprocess(axioms, support, stats, equality, search._check_limits)
+        # Axioms kept out of the usable set are never rewritten by or superposed with each
+        # other, and ordered superposition is incomplete without that
+        restricted = set_of_support and not equality and bool(axioms)
+        for c in axioms:
+            if restricted:
+                search.add_axiom(c)
+            else:
+                search.add_input(c)
+        for c in support:
+            search.add_input(c, GOAL)
+        for c in rewritten:
+            search.add_input(c, SIMPLIFIED)
+        stats.add_time("preprocess", time.perf_counter() - t0)
+        empty = search.run()
+        if empty is None:
+            # Saturating a depth-bounded selection says nothing about the clauses left out, and a
+            # restricted search is only complete over consistent axioms: with P and ¬P in the KB
+            # every goal follows, yet neither strategy ever resolves the two
+            if cut or filtered:
+                return ProofResult(ProofStatus.UNKNOWN, stats, "relevance")
+            if restricted:
+                return ProofResult(ProofStatus.UNKNOWN, stats, "set_of_support")
+            return ProofResult(ProofStatus.DISPROVED, stats)
+        return ProofResult(ProofStatus.PROVED, stats, proof=search.proof(empty))
+    except _LimitReached as e:
+        return ProofResult(ProofStatus.UNKNOWN, stats, e.reason)
+    except RecursionError:
+        # The term helpers are iterative, but hashing and comparing Function terms still recurse
+        return ProofResult(ProofStatus.UNKNOWN, stats, "depth")
+    finally:
+        if track_memory:
+            stats.peak_memory = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+            if started_tracing:
+                tracemalloc.stop()
+
+def _preprocess(axioms: List[Clause], support: List[Clause], stats: ProofStats, equality: bool,
+                stop: Callable[[], None]) -> tuple[List[Clause], List[Clause], List[Clause]]:
+    # Clauses the pipeline rewrote stay in the set of support, that only makes it larger
+    work = KB()
+    for c in list(axioms) + support:
+        if c not in work:
+            work.add_clause(c)
+    before = len(work)
+    simplify(work, preserve_models=False, equality=equality, stop=stop)
+    stats.simplified = before - len(work)
+    axiom_set, support_set = set(axioms), set(support)
+    kept_axioms, kept_support, rewritten = [], [], []
+    for c in work.clauses:
+        if c in support_set:
+            kept_support.append(c)
+        elif c in axiom_set:
+            kept_axioms.append(c)
+        else:
+            rewritten.append(c)
+    return kept_axioms, kept_support, rewritten
+
+async def prove_async(kb: KB, goal: Clause, limits: Optional[ProofLimits] = None,
+                      cancel: Optional[CancelToken] = None,
+                      stats: Optional[ProofStats] = None, **options: Any) -> ProofResult:
+    # Runs the search in the default executor, cancelling the task stops the search too.
+    # Any other prove() keyword (preprocess, equality, record_proof, model_size, ...) passes through.
+    cancel = CancelToken() if cancel is None else cancel
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(None, functools.partial(prove, kb, goal, limits, cancel, stats, **options))
+    try:
+        return await future
+    except asyncio.CancelledError:
+        cancel.cancel()
+        raise
+
+def refutation_proof(kb: KB, goal: Clause, stats: Optional[ProofStats] = None,
+                     trace: Optional[TextIO] = None, trace_every: int = 1,
+                     track_memory: bool = False, model_size: int = 0) -> bool:
+    # Pass a ProofStats to read the counters back; trace receives every trace_every-th given clause
+    return prove(kb, goal, stats=stats, trace=trace, trace_every=trace_every,
+                 track_memory=track_memory, model_size=model_size).status is ProofStatus.PROVED
+
 
-        
-    
 if __name__ == '__main__':
     P = Literal("P", ())
     notP = P.negate()
@@ -26,9 +654,13 @@ if __name__ == '__main__':
     print("Knowledge Base Clauses:")
     for clause in kb.clauses:
         print(clause)
-    
+
     # after kb = KB([c1, c2, c3])
-for lit in [P, notP, Q, R]:
-    print(f"{lit} appears in clauses:",
-          [str(c) for c in kb.index.get(lit, [])])
+    for lit in [P, notP, Q, R]:
+        print(f"{lit} appears in clauses:",
+              [str(c) for c in kb.index.get(lit, [])])
 
+    stats = ProofStats()
+    print(f"KB ⊢ {Q}:", refutation_proof(kb, Clause(frozenset({Q})), stats))
+    print(stats.as_dict())
+    print(prove(kb, Clause(frozenset({Q})), record_proof=True).proof)
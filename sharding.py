@@ -0,0 +1,232 @@
+from structure import *
+from unification import subsumes
+from wire import encode_many, decode_many
+from multiprocessing import resource_tracker, shared_memory
+from typing import Iterable, Optional
+import multiprocessing
+import os
+import threading
+import sys
+import zlib
+
+
+# Requests a shard worker understands, each answered with exactly one reply
+_LOAD = "load"          # a batch of clauses in a shared memory block
+_REMOVE = "remove"
+_WITH = "with"          # clauses_with(name, positive)
+_SUBSUMERS = "subsumers"
+_SUBSUMED = "subsumed"
+_CONTAINS = "contains"
+_LEN = "len"
+_CLAUSES = "clauses"
+_CLOSE = "close"
+
+# SharedMemory(track=...) exists from Python 3.13 on
+_TRACK_OPTION = sys.version_info >= (3, 13)
+
+
+def shard_of(name: str, shards: int) -> int:
+    # crc32 rather than hash(), which is salted per process
+    return zlib.crc32(name.encode("utf-8")) % shards
+
+def _owners(clause: Clause, shards: int) -> set[int]:
+    return {shard_of(lit.name, shards) for lit in clause.literals}
+
+def _home(clause: Clause, shards: int) -> int:
+    # Every shard owning one of the predicates stores the clause, the one owning the smallest
+    # predicate name counts it, so lengths and full listings see each clause once
+    return shard_of(min(lit.name for lit in clause.literals), shards)
+
+
+def _worker(conn, shard: int, shards: int) -> None:
+    kb = KB()
+    home = 0
+    while True:
+        op, arg = conn.recv()
+        if op == _LOAD:
+            name, size = arg
+            # The coordinator owns and unlinks the block. Before Python 3.13 attaching registers it with
+            # the resource tracker again, which is the coordinator's own (see ShardedKB) and keeps
+            # one entry per name, so the coordinator's unlink still clears it.
+            if _TRACK_OPTION:
+                block = shared_memory.SharedMemory(name=name, track=False)
+            else:
+                block = shared_memory.SharedMemory(name=name)
+            try:
+                # Decoded straight out of the shared block, the view is released before closing it
+                view = block.buf[:size]
+                clauses = decode_many(view)
+                view.release()
+            finally:
+                block.close()
+            added = 0
+            for c in clauses:
+                if c not in kb:
+                    kb.add_clause(c)
+                    added += _home(c, shards) == shard
+            home += added
+            conn.send(added)
+        elif op == _REMOVE:
+            present = {c for c in arg if c in kb}
+            kb.remove_clauses(present)
+            removed = sum(1 for c in present if _home(c, shards) == shard)
+            home -= removed
+            conn.send(removed)
+        elif op == _WITH:
+            conn.send(kb.clauses_with(*arg))
+        elif op == _SUBSUMERS:
+            # A subsumer has at least one literal, and that literal's predicate also occurs in arg
+            candidates = {id(c): c for lit in arg.literals
+                          if shard_of(lit.name, shards) == shard
+                          for c in kb.clauses_with(lit.name, lit.positive)}
+            conn.send([c for c in candidates.values() if subsumes(c, arg)])
+        elif op == _SUBSUMED:
+            lit = next(iter(arg.literals))
+            conn.send([c for c in kb.clauses_with(lit.name, lit.positive) if subsumes(arg, c)])
+        elif op == _CONTAINS:
+            conn.send(arg in kb)
+        elif op == _LEN:
+            conn.send(home)
+        elif op == _CLAUSES:
+            conn.send([c for c in kb.clauses if _home(c, shards) == shard])
+        elif op == _CLOSE:
+            conn.send(None)
+            conn.close()
+            return
+
+
+class ShardedKB:
+    # Clauses partitioned over worker processes by predicate symbol. A clause lives on every shard
+    # owning one of its predicates, so a partner lookup or a subsumption query only needs the shards
+    # owning the predicates it mentions. Batches travel through shared memory, queries over pipes.
+    # Offers the read side of the KB API (clauses, clauses_with, in, len), so prove() accepts it.
+    def __init__(self, shards: Optional[int] = None, context: Optional[str] = None):
+        self.shards = shards or os.cpu_count() or 1
+        ctx = multiprocessing.get_context(context)
+        if os.name == "posix":
+            # Started before the workers, so forked ones share it just like spawned ones do,
+            # and no worker ever runs a tracker of its own that would see blocks it did not create
+            resource_tracker.ensure_running()
+        self._conns = []
+        self._processes = []
+        for i in range(self.shards):
+            parent, child = ctx.Pipe()
+            p = ctx.Process(target=_worker, args=(child, i, self.shards), daemon=True)
+            p.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(p)
+        # The empty clause has no predicate to route by, the coordinator keeps it
+        self._empty = False
+        self._lock = threading.Lock()
+
+    def _ask(self, requests: Dict[int, tuple]) -> Dict[int, Any]:
+        # Sends every request first and then collects, so the shards work in parallel
+        with self._lock:
+            for shard, request in requests.items():
+                self._conns[shard].send(request)
+            return {shard: self._conns[shard].recv() for shard in requests}
+
+    def add_clause(self, clause: Clause) -> None:
+        self.add_clauses([clause])
+
+    def add_clauses(self, clauses: Iterable[Clause]) -> int:
+        # Duplicates are skipped quietly, like KB.add_clauses
+        batches: Dict[int, List[Clause]] = {}
+        added = 0
+        for c in clauses:
+            if not c.literals:
+                added += not self._empty
+                self._empty = True
+                continue
+            for shard in _owners(c, self.shards):
+                batches.setdefault(shard, []).append(c)
+        blocks = []
+        try:
+            requests = {}
+            for shard, batch in batches.items():
+                data = encode_many(batch)
+                block = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+                blocks.append(block)
+                block.buf[:len(data)] = data
+                requests[shard] = (_LOAD, (block.name, len(data)))
+            added += sum(self._ask(requests).values())
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+        return added
+
+    def remove_clauses(self, clauses: Set[Clause]) -> int:
+        removed = 0
+        batches: Dict[int, List[Clause]] = {}
+        for c in clauses:
+            if not c.literals:
+                removed += self._empty
+                self._empty = False
+                continue
+            for shard in _owners(c, self.shards):
+                batches.setdefault(shard, []).append(c)
+        replies = self._ask({shard: (_REMOVE, batch) for shard, batch in batches.items()})
+        return removed + sum(replies.values())
+
+    def remove_clause(self, clause: Clause) -> bool:
+        return self.remove_clauses({clause}) == 1
+
+    def clauses_with(self, name: str, positive: bool) -> list[Clause]:
+        shard = shard_of(name, self.shards)
+        return self._ask({shard: (_WITH, (name, positive))})[shard]
+
+    def subsumers(self, clause: Clause) -> list[Clause]:
+        # Stored clauses that subsume clause, asked only from the shards owning its predicates
+        found = [Clause(frozenset())] if self._empty else []
+        if clause.literals:
+            replies = self._ask({shard: (_SUBSUMERS, clause) for shard in _owners(clause, self.shards)})
+            seen = set(found)
+            for reply in replies.values():
+                for c in reply:
+                    if c not in seen:
+                        seen.add(c)
+                        found.append(c)
+        return found
+
+    def subsumed_by(self, clause: Clause) -> list[Clause]:
+        # Stored clauses subsumed by clause, they contain every predicate of clause so one shard is enough
+        if not clause.literals:
+            return self.clauses
+        shard = shard_of(next(iter(clause.literals)).name, self.shards)
+        return self._ask({shard: (_SUBSUMED, clause)})[shard]
+
+    @property
+    def clauses(self) -> list[Clause]:
+        replies = self._ask({shard: (_CLAUSES, None) for shard in range(self.shards)})
+        result = [Clause(frozenset())] if self._empty else []
+        for shard in range(self.shards):
+            result.extend(replies[shard])
+        return result
+
+    def __contains__(self, clause: Clause) -> bool:
+        if not clause.literals:
+            return self._empty
+        shard = _home(clause, self.shards)
+        return self._ask({shard: (_CONTAINS, clause)})[shard]
+
+    def __len__(self) -> int:
+        replies = self._ask({shard: (_LEN, None) for shard in range(self.shards)})
+        return sum(replies.values()) + self._empty
+
+    def close(self) -> None:
+        if not self._conns:
+            return
+        self._ask({shard: (_CLOSE, None) for shard in range(self.shards)})
+        for conn, p in zip(self._conns, self._processes):
+            conn.close()
+            p.join()
+        self._conns = []
+        self._processes = []
+
+    def __enter__(self) -> "ShardedKB":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,234 @@
+from structure import *
+from logic_syntax import Function
+from unification import (Substitution, is_variable, match, match_literals, unify_literals, substitute_clause,
+                         rename_clause)
+from superposition import EQUALITY
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+@dataclass
+class SimplifyStats:
+    rounds: int = 0
+    merged: int = 0           # clauses that lost literals by merging
+    unit_deleted: int = 0     # literals removed because a unit clause refutes them
+    unit_subsumed: int = 0    # clauses removed because a unit clause subsumes them
+    pure: int = 0
+    blocked: int = 0
+    eliminated: int = 0       # clauses replaced by their resolvents during predicate elimination
+    resolvents: int = 0
+
+    @property
+    def removed(self) -> int:
+        return self.unit_subsumed + self.pure + self.blocked + self.eliminated - self.resolvents
+
+
+def is_tautology(clause: Clause) -> bool:
+    return any(lit.negate() in clause.literals for lit in clause.literals)
+
+def _instantiate(t: Any, theta: Substitution) -> Any:
+    # Applies a match in one step. Its bindings can mention the variables they bind (x ↦ y, y ↦ x),
+    # which substitute() would keep walking.
+    if isinstance(t, Function):
+        return Function(t.name, tuple(_instantiate(a, theta) for a in t.args), t.range)
+    return theta.get(t, t) if is_variable(t) else t
+
+def _instantiate_clause(clause: Clause, theta: Substitution) -> Clause:
+    return Clause(frozenset(Literal(lit.name, tuple(_instantiate(a, theta) for a in lit.args), lit.positive)
+                            for lit in clause.literals))
+
+def merge_duplicate_literals(clause: Clause) -> Clause:
+    # The frozenset already merges identical literals, this also merges literals that become
+    # identical under a substitution mapping the clause into a proper subset of itself (condensing)
+    changed = True
+    while changed:
+        changed = False
+        for a in clause.literals:
+            for b in clause.literals:
+                if a is b:
+                    continue
+                theta = match_literals(a, b)
+                if theta is None:
+                    continue
+                smaller = _instantiate_clause(clause, theta)
+                if smaller.literals < clause.literals:
+                    clause = smaller
+                    changed = True
+                    break
+            if changed:
+                break
+    return clause
+
+
+def _replace(kb: KB, replacements: Dict[Clause, Clause], removals: Set[Clause]) -> None:
+    kb.remove_clauses(removals | set(replacements))
+    for new in replacements.values():
+        if new not in kb:
+            kb.add_clause(new)
+
+def _merge_pass(kb: KB, stats: SimplifyStats, stop: Optional[Callable[[], None]] = None) -> bool:
+    replacements = {}
+    for c in kb.clauses:
+        if stop is not None:
+            stop()
+        if len(c.literals) > 1:
+            merged = merge_duplicate_literals(c)
+            if merged is not c:
+                replacements[c] = merged
+    stats.merged += len(replacements)
+    _replace(kb, replacements, set())
+    return bool(replacements)
+
+def _unit_pass(kb: KB, stats: SimplifyStats) -> bool:
+    units: dict[tuple[str, bool], list[Literal]] = {}
+    for c in kb.clauses:
+        if len(c.literals) == 1:
+            lit = next(iter(rename_clause(c).literals))
+            units.setdefault((lit.name, lit.positive), []).append(lit)
+    if not units:
+        return False
+
+    replacements, removals = {}, set()
+    for c in kb.clauses:
+        if not c.literals:
+            continue
+        kept = []
+        subsumed = False
+        for lit in c.literals:
+            # A unit would subsume itself, units only get checked for deletion
+            if len(c.literals) > 1 and any(match(u.args, lit.args) is not None for u in units.get((lit.name, lit.positive), ())):
+                subsumed = True
+                break
+            if any(match(u.args, lit.args) is not None for u in units.get((lit.name, not lit.positive), ())):
+                continue
+            kept.append(lit)
+        if subsumed:
+            removals.add(c)
+        elif len(kept) < len(c.literals):
+            replacements[c] = Clause(frozenset(kept))
+            stats.unit_deleted += len(c.literals) - len(kept)
+    stats.unit_subsumed += len(removals)
+    _replace(kb, replacements, removals)
+    return bool(replacements or removals)
+
+def unit_propagate(kb: KB, stats: Optional[SimplifyStats] = None) -> bool:
+    # Unit subsumption and unit deletion until no new unit clause shows up
+    stats = SimplifyStats() if stats is None else stats
+    changed = False
+    while _unit_pass(kb, stats):
+        changed = True
+        if Clause(frozenset()) in kb:
+            break
+    return changed
+
+
+def eliminate_pure(kb: KB, stats: Optional[SimplifyStats] = None) -> bool:
+    # A predicate that only occurs with one sign can be made true, so its clauses never matter
+    stats = SimplifyStats() if stats is None else stats
+    removals = set()
+    predicates = kb.predicates()
+    for name, positive in predicates:
+        # Equality is interpreted, a pure "=" literal can still interact through rewriting
+        if name != EQUALITY and (name, not positive) not in predicates:
+            removals.update(kb.clauses_with(name, positive))
+    removed = kb.remove_clauses(removals)
+    stats.pure += removed
+    return removed > 0
+
+def _resolvents_on(clause: Clause, lit: Literal, partner: Clause) -> Optional[List[Clause]]:
+    # Resolvents of clause and partner upon lit, None when partner has several candidate literals
+    partner = rename_clause(partner)
+    others = [o for o in partner.literals if o.name == lit.name and o.positive != lit.positive]
+    if len(others) > 1:
+        return None
+    result = []
+    for other in others:
+        theta = unify_literals(lit, other)
+        if theta is None:
+            continue
+        rest = (clause.literals - {lit}) | (partner.literals - {other})
+        result.append(substitute_clause(Clause(frozenset(rest)), theta))
+    return result
+
+def _is_blocked(kb: KB, clause: Clause, lit: Literal, max_occurrences: int) -> bool:
+    if lit.name == EQUALITY:
+        return False
+    partners = kb.clauses_with(lit.name, not lit.positive)
+    if len(partners) > max_occurrences:
+        return False
+    for d in partners:
+        if d == clause:
+            return False
+        resolvents = _resolvents_on(clause, lit, d)
+        if resolvents is None or not all(is_tautology(r) for r in resolvents):
+            return False
+    return True
+
+def eliminate_blocked(kb: KB, stats: Optional[SimplifyStats] = None, max_occurrences: int = 16) -> bool:
+    # Removing one blocked clause never unblocks another one, so a single sweep is enough
+    stats = SimplifyStats() if stats is None else stats
+    removals = {c for c in kb.clauses
+                if any(_is_blocked(kb, c, lit, max_occurrences) for lit in c.literals)}
+    removed = kb.remove_clauses(removals)
+    stats.blocked += removed
+    return removed > 0
+
+def eliminate_predicates(kb: KB, stats: Optional[SimplifyStats] = None, max_occurrences: int = 16) -> bool:
+    # Replaces all clauses on a predicate by their resolvents whenever that does not grow the set
+    stats = SimplifyStats() if stats is None else stats
+    changed = False
+    names = sorted({name for name, _ in kb.predicates() if name != EQUALITY},
+                   key=lambda n: len(kb.clauses_with(n, True)) + len(kb.clauses_with(n, False)))
+    for name in names:
+        pos, neg = kb.clauses_with(name, True), kb.clauses_with(name, False)
+        if not pos or not neg or len(pos) + len(neg) > max_occurrences:
+            continue
+        # Clauses mentioning the predicate twice would need factoring, leave those alone
+        if any(sum(1 for l in c.literals if l.name == name) > 1 for c in pos + neg):
+            continue
+        resolvents = set()
+        for p in pos:
+            lit = next(l for l in p.literals if l.name == name)
+            for n in neg:
+                for r in _resolvents_on(p, lit, n):
+                    if not is_tautology(r):
+                        resolvents.add(r)
+        if len(resolvents) > len(pos) + len(neg):
+            continue
+        stats.eliminated += len(pos) + len(neg)
+        stats.resolvents += len(resolvents)
+        _replace(kb, {}, set(pos) | set(neg))
+        for r in resolvents:
+            if r not in kb:
+                kb.add_clause(r)
+        changed = True
+    return changed
+
+
+def simplify(kb: KB, preserve_models: bool = True, max_rounds: int = 10,
+             max_occurrences: int = 16, equality: Optional[bool] = None,
+             stop: Optional[Callable[[], None]] = None) -> SimplifyStats:
+    # Merging and unit propagation keep the KB equivalent. Pure literal, blocked clause and predicate
+    # elimination only keep it (un)satisfiable, so only run those with preserve_models=False on the
+    # full problem, negated goal included. Blocked clause and predicate elimination only see
+    # syntactic resolvents, which equality can make P(a) and ¬P(b) into, so they are skipped when
+    # equality is on (None means whenever the KB has an "=" literal). stop is called between
+    # steps and can raise to abandon the pipeline.
+    if equality is None:
+        equality = any((EQUALITY, positive) in kb.predicates() for positive in (True, False))
+    stats = SimplifyStats()
+    empty = Clause(frozenset())
+    while stats.rounds < max_rounds and empty not in kb:
+        stats.rounds += 1
+        changed = _merge_pass(kb, stats, stop)
+        changed |= unit_propagate(kb, stats)
+        if stop is not None:
+            stop()
+        if not preserve_models and empty not in kb:
+            changed |= eliminate_pure(kb, stats)
+            if not equality:
+                changed |= eliminate_blocked(kb, stats, max_occurrences)
+                changed |= eliminate_predicates(kb, stats, max_occurrences)
+        if not changed:
+            break
+    return stats
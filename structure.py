@@ -1,5 +1,7 @@
 from dataclasses import dataclass
-from typing import Tuple, FrozenSet, Dict, List, Any, Set
+from array import array
+from typing import Tuple, FrozenSet, Dict, List, Any, Set, Iterable, Optional
+import threading
 
 @dataclass(frozen=True)
 class Literal:
@@ -11,6 +13,8 @@ class Literal:
         return Literal(self.name, self.args, not self.positive)
     
     def __str__(self) -> str:
+        if self.name == "=" and len(self.args) == 2:
+            return f"{self.args[0]} {'=' if self.positive else '≠'} {self.args[1]}"
         prefix = "" if self.positive else "¬"
         joined = ", ".join(map(str, self.args))
         return f"{prefix}{self.name}({joined})"
@@ -24,23 +28,181 @@ class Clause:
     def __str__(self) -> str:
         return ", ".join(map(str, self.literals))
 
+class _Log:
+    # Append-only clause storage, the only copy of the clauses a KB and its snapshots hold. Entries are
+    # never moved or overwritten, a removal only records the version it happened at, so (log, version)
+    # is a fixed view of the KB however far the writer has moved on. Every add and every remove_clauses
+    # call is one version step.
+    __slots__ = ("clauses", "born", "died", "buckets", "positions", "counts", "version")
+
+    def __init__(self, version: int = 0):
+        self.clauses: list[Clause] = []
+        self.born = array("q")
+        self.died: dict[int, int] = {}
+        self.buckets: dict[tuple[str, bool], list[int]] = {}
+        self.positions: dict[Clause, list[int]] = {}
+        self.counts: dict[tuple[str, bool], int] = {}  # live clauses per (predicate, sign)
+        self.version = version
+
+    def append(self, clause: Clause) -> None:
+        # The version is published last, so a snapshot taken meanwhile does not see a half added clause
+        pos = len(self.clauses)
+        self.clauses.append(clause)
+        self.born.append(self.version)
+        self.positions.setdefault(clause, []).append(pos)
+        for key in {(lit.name, lit.positive) for lit in clause.literals}:
+            self.buckets.setdefault(key, []).append(pos)
+            self.counts[key] = self.counts.get(key, 0) + 1
+        self.version += 1
+
+    def remove(self, clauses: Set[Clause]) -> None:
+        for c in clauses:
+            self.died[self.positions[c][-1]] = self.version
+            for key in {(lit.name, lit.positive) for lit in c.literals}:
+                self.counts[key] -= 1
+                if not self.counts[key]:
+                    del self.counts[key]
+        self.version += 1
+
+    def visible(self, pos: int, version: int) -> bool:
+        return self.born[pos] < version and self.died.get(pos, version) >= version
+
+    def live(self, pos: int) -> bool:
+        # Visible at the newest version, which is what the KB itself reads
+        return pos not in self.died
+
+    def compacted(self) -> "_Log":
+        # Live entries only, in the same order. Snapshots keep the old log, the KB moves to this one.
+        log = _Log(self.version)
+        for pos, clause in enumerate(self.clauses):
+            if pos not in self.died:
+                log.version = self.born[pos]
+                log.append(clause)
+        log.version = self.version
+        return log
+
+
+class KBSnapshot:
+    # Immutable view of a KB at one version, taken in O(1) by KB.snapshot(). Reading never takes a lock,
+    # it only skips log entries added after the snapshot or removed before it. Supports the read side of
+    # the KB API, so prove() and relevant_clauses() accept a snapshot as their kb.
+    def __init__(self, log: _Log, version: int):
+        self._log = log
+        self.version = version
+        self._clauses: Optional[list[Clause]] = None
+
+    @property
+    def clauses(self) -> list[Clause]:
+        if self._clauses is None:
+            log, version = self._log, self.version
+            clauses = []
+            for pos, born in enumerate(log.born):
+                if born >= version:
+                    break
+                if log.died.get(pos, version) >= version:
+                    clauses.append(log.clauses[pos])
+            self._clauses = clauses
+        return self._clauses
+
+    def clauses_with(self, name: str, positive: bool) -> list[Clause]:
+        log, version = self._log, self.version
+        result = []
+        for pos in log.buckets.get((name, positive), ()):
+            # Positions are appended in version order, the rest of the bucket is newer than this snapshot
+            if log.born[pos] >= version:
+                break
+            if log.died.get(pos, version) >= version:
+                result.append(log.clauses[pos])
+        return result
+
+    def __contains__(self, clause: Clause) -> bool:
+        return any(self._log.visible(pos, self.version) for pos in self._log.positions.get(clause, ()))
+
+    def __len__(self) -> int:
+        return len(self.clauses)
+
+
 class KB:
+    # Clauses live in the log only, the KB reads it at the newest version and snapshots at an older one
     def __init__(self, clauses: list[Clause] | None = None):
-        self.clauses: list[Clause] = []
-        self._clause_set: Set[Clause] = set()
-        self.index: dict[Literal, list[Clause]] = {}
+        self._log = _Log()
+        self._live: Optional[list[Clause]] = None
+        self._write_lock = threading.Lock()
         if clauses:
             for c in clauses:
                 self.add_clause(c)
 
     def add_clause(self, clause: Clause) -> None:
-            if clause in self._clause_set:
+        with self._write_lock:
+            if clause in self:
                 print("already exists")
             else:
-                self._clause_set.add(clause)
-                self.clauses.append(clause)
-                for lit in clause.literals:
-                    self.index.setdefault(lit, []).append(clause)
+                self._log.append(clause)
+                self._live = None
+
+    def snapshot(self) -> KBSnapshot:
+        # O(1): the snapshot shares the log, later writes only append to it
+        log = self._log
+        return KBSnapshot(log, log.version)
+
+    def add_clauses(self, clauses: Iterable[Clause]) -> int:
+        # Consumes clauses as they arrive (e.g. from clausal_form_stream), duplicates are skipped quietly
+        added = 0
+        for clause in clauses:
+            if clause not in self:
+                self.add_clause(clause)
+                added += 1
+        return added
+
+    @property
+    def clauses(self) -> list[Clause]:
+        # Without removals the log is exactly the live list, otherwise it is filtered once per write
+        log = self._log
+        if not log.died:
+            return log.clauses
+        if self._live is None:
+            self._live = [c for pos, c in enumerate(log.clauses) if pos not in log.died]
+        return self._live
+
+    @property
+    def index(self) -> dict[Literal, list[Clause]]:
+        # Built on demand, nothing in the search reads it
+        index: dict[Literal, list[Clause]] = {}
+        for c in self.clauses:
+            for lit in c.literals:
+                index.setdefault(lit, []).append(c)
+        return index
+
+    def clauses_with(self, name: str, positive: bool) -> list[Clause]:
+        log = self._log
+        return [log.clauses[pos] for pos in log.buckets.get((name, positive), ()) if log.live(pos)]
+
+    def predicates(self) -> Set[tuple[str, bool]]:
+        # (predicate, sign) pairs with at least one clause
+        return set(self._log.counts)
+
+    def __contains__(self, clause: Clause) -> bool:
+        # A KB never holds a clause twice, so only its newest position can be live
+        positions = self._log.positions.get(clause)
+        return bool(positions) and self._log.live(positions[-1])
+
+    def __len__(self) -> int:
+        return len(self._log.clauses) - len(self._log.died)
+
+    def remove_clauses(self, clauses: Set[Clause]) -> int:
+        with self._write_lock:
+            return self._remove_clauses(clauses)
 
+    def _remove_clauses(self, clauses: Set[Clause]) -> int:
+        clauses = {c for c in clauses if c in self}
+        if not clauses:
+            return 0
+        self._log.remove(clauses)
+        # Once removed entries make up half the log, live snapshots keep the old one and the KB starts over
+        if len(self._log.died) * 2 > len(self._log.clauses):
+            self._log = self._log.compacted()
+        self._live = None
+        return len(clauses)
 
-    
\ No newline at end of file
+    def remove_clause(self, clause: Clause) -> bool:
+        return self.remove_clauses({clause}) == 1
@@ -0,0 +1,232 @@
+from structure import *
+from logic_syntax import Function, Var
+from unification import (Substitution, is_variable, unify, match, substitute, substitute_clause, term_variables,
+                         term_weight, rename_clause)
+from typing import Iterator, Optional
+
+
+# s = t is Literal(EQUALITY, (s, t)) and s ≠ t the same literal with positive=False
+EQUALITY = "="
+
+Position = Tuple[int, ...]
+
+
+def equation(s: Any, t: Any, positive: bool = True) -> Literal:
+    return Literal(EQUALITY, (s, t), positive)
+
+def is_equation(lit: Literal) -> bool:
+    return lit.name == EQUALITY and len(lit.args) == 2
+
+def has_equality(clauses: Iterable[Clause]) -> bool:
+    return any(is_equation(lit) for c in clauses for lit in c.literals)
+
+def is_trivial(clause: Clause) -> bool:
+    # Tautologies that only equality knows about: a clause holding t = t
+    return any(lit.positive and is_equation(lit) and lit.args[0] == lit.args[1] for lit in clause.literals)
+
+
+def symbol(t: Any) -> Optional[tuple[str, int]]:
+    # Top symbol with its arity, None for a variable. Skolem constants are 0-ary symbols.
+    if isinstance(t, Function):
+        return (t.name, len(t.args))
+    if is_variable(t):
+        return None
+    if isinstance(t, Var):
+        return (t.name, 0)
+    return (str(t), 0)
+
+def _var_counts(t: Any, counts: Dict[Var, int], step: int) -> None:
+    for v in term_variables(t):
+        counts[v] = counts.get(v, 0) + step
+
+def kbo_greater(s: Any, t: Any) -> bool:
+    # Knuth-Bendix ordering, every symbol weighs 1 and the precedence compares (arity, name).
+    # s > t needs at least as many occurrences of every variable, then a heavier s, or equal weight
+    # and a bigger top symbol, or the same symbol and lexicographically bigger arguments, which
+    # compares the first differing pair the same way (a loop, so deep terms cannot overflow).
+    while s != t:
+        counts: Dict[Var, int] = {}
+        _var_counts(s, counts, 1)
+        _var_counts(t, counts, -1)
+        if any(n < 0 for n in counts.values()):
+            return False
+        ws, wt = term_weight(s), term_weight(t)
+        if ws != wt:
+            return ws > wt
+        if is_variable(t):
+            # Equal weight and the variable occurs in s, so s is a chain of unary functions over t
+            return not is_variable(s)
+        if is_variable(s):
+            return False
+        fs, ft = symbol(s), symbol(t)
+        if fs != ft:
+            return (fs[1], fs[0]) > (ft[1], ft[0])
+        pair = next(((a, b) for a, b in zip(s.args, t.args) if a != b), None)
+        if pair is None:
+            return False
+        s, t = pair
+    return False
+
+
+def subterms(t: Any, path: Position = ()) -> Iterator[tuple[Position, Any]]:
+    # Non-variable subterms with their positions, outermost first
+    stack = [(path, t)]
+    while stack:
+        p, u = stack.pop()
+        if is_variable(u):
+            continue
+        yield p, u
+        if isinstance(u, Function):
+            for i in range(len(u.args) - 1, -1, -1):
+                stack.append((p + (i,), u.args[i]))
+
+def literal_subterms(lit: Literal) -> Iterator[tuple[Position, Any]]:
+    for i, arg in enumerate(lit.args):
+        yield from subterms(arg, (i,))
+
+def replace_at(t: Any, path: Position, new: Any) -> Any:
+    # Rebuilds the spine from the bottom up
+    spine = []
+    for i in path:
+        spine.append((t, i))
+        t = t.args[i]
+    for t, i in reversed(spine):
+        new = Function(t.name, t.args[:i] + (new,) + t.args[i + 1:], t.range)
+    return new
+
+def replace_in_literal(lit: Literal, path: Position, new: Any) -> Literal:
+    i = path[0]
+    args = lit.args[:i] + (replace_at(lit.args[i], path[1:], new),) + lit.args[i + 1:]
+    return Literal(lit.name, args, lit.positive)
+
+def _sides(eq: Literal) -> Iterator[tuple[Any, Any]]:
+    # Both orientations of an equation. A variable side x can only be bigger than the other side t
+    # when x does not occur in t, otherwise t ≥ x and the side is skipped.
+    s, t = eq.args
+    if not is_variable(s) or s not in set(term_variables(t)):
+        yield s, t
+    if s != t and (not is_variable(t) or t not in set(term_variables(s))):
+        yield t, s
+
+
+def superpositions(c1: Clause, eq: Literal, c2: Clause) -> List[tuple[Clause, Substitution]]:
+    # Rewrites c2 with the positive equation eq of c1 wherever one side unifies with a subterm of c2:
+    # C ∨ s = t and D ∨ L[u] with σ = mgu(s, u) give (C ∨ D ∨ L[t])σ, unless tσ ≥ sσ.
+    # c1 and c2 must not share variables. Subterms that are variables are never rewritten into.
+    rest1 = c1.literals - {eq}
+    result = []
+    for s, t in _sides(eq):
+        top = symbol(s)
+        for lit in c2.literals:
+            for path, u in literal_subterms(lit):
+                if top is not None and symbol(u) != top:
+                    continue
+                theta = unify(s, u)
+                if theta is None:
+                    continue
+                s_, t_ = substitute(s, theta), substitute(t, theta)
+                if s_ == t_ or kbo_greater(t_, s_):
+                    continue
+                rewritten = replace_in_literal(lit, path, t)
+                literals = rest1 | (c2.literals - {lit}) | {rewritten}
+                result.append((substitute_clause(Clause(frozenset(literals)), theta), theta))
+    return result
+
+def equality_resolvents(clause: Clause) -> List[tuple[Clause, Substitution]]:
+    # C ∨ s ≠ t with σ = mgu(s, t) gives Cσ
+    result = []
+    for lit in clause.literals:
+        if not lit.positive and is_equation(lit):
+            theta = unify(*lit.args)
+            if theta is not None:
+                result.append((substitute_clause(Clause(clause.literals - {lit}), theta), theta))
+    return result
+
+def equality_factors(clause: Clause) -> List[tuple[Clause, Substitution]]:
+    # C ∨ s = t ∨ s' = t' with σ = mgu(s, s') gives (C ∨ t ≠ t' ∨ s' = t')σ, unless tσ ≥ sσ
+    eqs = [lit for lit in clause.literals if lit.positive and is_equation(lit)]
+    result = []
+    for a in eqs:
+        for b in eqs:
+            if a is b:
+                continue
+            for s, t in _sides(a):
+                for s2, t2 in ((b.args[0], b.args[1]), (b.args[1], b.args[0])):
+                    theta = unify(s, s2)
+                    if theta is None:
+                        continue
+                    s_, t_ = substitute(s, theta), substitute(t, theta)
+                    if kbo_greater(t_, s_):
+                        continue
+                    literals = (clause.literals - {a}) | {equation(t, t2, False)}
+                    result.append((substitute_clause(Clause(frozenset(literals)), theta), theta))
+    return result
+
+
+class Demodulators:
+    # Unit equations usable for rewriting, indexed by the top symbol of the side they rewrite from.
+    # An orientable equation l = r with l > r is stored once; an unorientable one both ways, and then
+    # only instances where the ordering holds get used (ordered rewriting).
+    def __init__(self):
+        self.index: dict[tuple[str, int], dict[int, list[tuple[Any, Any, bool]]]] = {}
+        self.keys: dict[int, list[tuple[str, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, cid: int, clause: Clause) -> bool:
+        if len(clause.literals) != 1:
+            return False
+        lit = next(iter(clause.literals))
+        if not lit.positive or not is_equation(lit):
+            return False
+        # Fresh variables, so a matched target never shares one with the rule and match() stays one-way
+        s, t = next(iter(rename_clause(clause).literals)).args
+        if kbo_greater(s, t):
+            rules = [(s, t, True)]
+        elif kbo_greater(t, s):
+            rules = [(t, s, True)]
+        else:
+            rules = [(l, r, False) for l, r in ((s, t), (t, s))
+                     if not is_variable(l) and set(term_variables(r)) <= set(term_variables(l))]
+        for l, r, oriented in rules:
+            key = symbol(l)
+            self.index.setdefault(key, {}).setdefault(cid, []).append((l, r, oriented))
+            self.keys.setdefault(cid, []).append(key)
+        return bool(rules)
+
+    def remove(self, cid: int) -> None:
+        for key in self.keys.pop(cid, ()):
+            bucket = self.index.get(key)
+            if bucket is not None:
+                bucket.pop(cid, None)
+
+    def symbols(self, cid: int) -> List[tuple[str, int]]:
+        return self.keys.get(cid, [])
+
+    def _rewrite_term(self, u: Any, only: Optional[int]) -> Optional[tuple[Any, int, Substitution]]:
+        bucket = self.index.get(symbol(u))
+        if not bucket:
+            return None
+        for cid, rules in bucket.items() if only is None else ((only, bucket.get(only, ())),):
+            for l, r, oriented in rules:
+                theta = match(l, u)
+                if theta is None:
+                    continue
+                new = substitute(r, theta)
+                if oriented or kbo_greater(u, new):
+                    return new, cid, theta
+        return None
+
+    def rewrite_once(self, clause: Clause, only: Optional[int] = None) -> Optional[tuple[Clause, int, Substitution]]:
+        # One rewrite step at the first (outermost) reducible position. only restricts the step to
+        # one demodulator, which is what backward demodulation with a new unit needs.
+        for lit in clause.literals:
+            for path, u in literal_subterms(lit):
+                step = self._rewrite_term(u, only)
+                if step is None:
+                    continue
+                new, cid, theta = step
+                rewritten = replace_in_literal(lit, path, new)
+                return Clause((clause.literals - {lit}) | {rewritten}), cid, theta
+        return None
@@ -1,7 +1,7 @@
 import pytest
 from logic_syntax import Var, Not, And, Or, Implies, Iff, ForAll, Exists, Function
-from structure import Literal, Clause
-from clausal_form import _eliminate_iff_imp, _eliminate_iff, _eliminate_imp, _push_not_inward, _standardize_vars, _skolemize, _to_prenex, _drop_universals, _distribute_or_over_and, _extract_clauses, clausal_form_converter
+from structure import Literal, Clause, KB
+from clausal_form import _eliminate_iff_imp, _eliminate_iff, _eliminate_imp, _push_not_inward, _standardize_vars, _skolemize, _to_prenex, _drop_universals, _distribute_or_over_and, _extract_clauses, _miniscope, clausal_form_converter, clausal_form_stream
 
 UNIVERSAL = "u"
 EXISTENTIAL = "e"
@@ -536,4 +536,148 @@ def test_clause_with_duplicate_literals():
 
     clauses = _extract_clauses(f)
     assert len(clauses) == 1
-    assert Clause({lit}) in clauses
\ No newline at end of file
+    assert Clause({lit}) in clauses
+
+
+# Streaming Tests
+
+def test_stream_matches_converter():
+    x = Var("x", UNIVERSAL)
+    y = Var("y", EXISTENTIAL)
+    A, B, C, D = (Literal(n, (x,)) for n in "ABCD")
+    formula = ForAll(x, Or(And(A, Implies(B, C)), Exists(y, And(D, Literal("E", (x, y))))))
+
+    converted = clausal_form_converter(formula)
+    streamed = list(clausal_form_stream(formula))
+    assert len(streamed) == len(converted)
+    shapes = lambda cs: sorted(sorted((l.name, l.positive) for l in c.literals) for c in cs)
+    assert shapes(streamed) == shapes(converted)
+
+def test_stream_is_lazy():
+    # 2^20 clauses, only the first one gets built
+    f = Literal("P0", ())
+    for i in range(20):
+        f = Or(f, And(Literal(f"A{i}", ()), Literal(f"B{i}", ())))
+    first = next(clausal_form_stream(f))
+    assert len(first.literals) == 21
+
+def test_extract_long_chain():
+    f = Literal("P0", ())
+    for i in range(1, 5000):
+        f = And(f, Literal(f"P{i}", ()))
+    clauses = _extract_clauses(f)
+    assert len(clauses) == 5000
+    assert clauses[0] == Clause(frozenset({Literal("P0", ())}))
+
+def test_kb_add_clauses_dedupes_stream():
+    A, B = Literal("A", ()), Literal("B", ())
+    kb = KB()
+    added = kb.add_clauses(clausal_form_stream(And(Or(A, B), And(A, Or(B, A)))))
+    assert added == 2
+    assert len(kb.clauses) == 2
+
+def test_shared_conversion_matches_tree():
+    x = Var("x", UNIVERSAL)
+    y = Var("y", EXISTENTIAL)
+    A, B, C, D = (Literal(n, (x,)) for n in "ABCD")
+    formula = ForAll(x, Or(And(A, Implies(B, C)), Exists(y, And(D, Literal("E", (x, y))))))
+
+    converted = clausal_form_converter(formula)
+    shared = clausal_form_converter(formula, share=True)
+    shapes = lambda cs: sorted(sorted((l.name, l.positive) for l in c.literals) for c in cs)
+    assert shapes(shared) == shapes(converted)
+
+def test_shared_conversion_visits_each_node_once():
+    # 2^40 nodes as a tree, 40 as a DAG
+    x = Var("x", UNIVERSAL)
+    f = Literal("P", (x,))
+    for _ in range(40):
+        f = ForAll(x, And(f, Not(Not(f))))
+    clauses = clausal_form_converter(f, share=True)
+    assert len(clauses) == 1
+    assert [l.name for l in next(iter(clauses)).literals] == ["P"]
+
+def test_shared_conversion_merges_equal_subformulas():
+    # Two structurally equal copies convert like one
+    A, B, C = Literal("A", ()), Literal("B", ()), Literal("C", ())
+    f = And(Or(A, And(B, C)), Or(A, And(B, C)))
+    assert len(clausal_form_converter(f)) == 4
+    assert len(clausal_form_converter(f, share=True)) == 2
+
+def test_define_shared_names_copied_conjunctions():
+    S = Literal("A1", ())
+    for i in range(2, 6):
+        S = And(S, Literal(f"A{i}", ()))
+    P = Literal("P", ())
+    f = Or(S, Or(P, S))
+    assert len(clausal_form_converter(f, share=True)) == 15
+    defined = clausal_form_converter(f, share=True, define_shared=True)
+    assert len(defined) == 1 + 5
+    heads = [l for c in defined for l in c.literals if l.name.startswith("def_")]
+    assert len({l.name for l in heads}) == 1
+
+def test_miniscope_splits_universal_over_and():
+    x = Var("x", UNIVERSAL)
+    f = ForAll(x, And(Literal("P", (x,)), Literal("Q", ())))
+    result = _miniscope(f)
+    assert result == And(ForAll(x, Literal("P", (x,))), Literal("Q", ()))
+
+def test_miniscope_moves_universal_past_or_operand():
+    x = Var("x", UNIVERSAL)
+    y = Var("y", EXISTENTIAL)
+    f = ForAll(x, Or(Exists(y, Literal("Q", (y,))), Literal("P", (x,))))
+    result = _miniscope(f)
+    assert result == Or(Exists(y, Literal("Q", (y,))), ForAll(x, Literal("P", (x,))))
+
+def test_miniscope_drops_vacuous_quantifiers():
+    x = Var("x", UNIVERSAL)
+    y = Var("y", EXISTENTIAL)
+    f = ForAll(x, Exists(y, Literal("P", ())))
+    assert _miniscope(f) == Literal("P", ())
+
+def test_miniscope_respects_shadowing():
+    x = Var("x", UNIVERSAL)
+    inner = ForAll(x, Literal("P", (x,)))
+    f = ForAll(x, Or(inner, Literal("Q", (x,))))
+    assert _miniscope(f) == Or(inner, ForAll(x, Literal("Q", (x,))))
+
+def test_skolem_function_only_takes_used_universals():
+    # ∀x∀z ∃y R(x, y): y does not depend on z
+    x = Var("x", UNIVERSAL)
+    z = Var("z", UNIVERSAL)
+    y = Var("y", EXISTENTIAL)
+    f = ForAll(x, ForAll(z, And(Exists(y, Literal("R", (x, y))), Literal("S", (z,)))))
+    clauses = clausal_form_converter(f)
+    r = next(l for c in clauses for l in c.literals if l.name == "R")
+    assert isinstance(r.args[1], Function)
+    assert r.args[1].args == (r.args[0],)
+
+def test_miniscoping_gives_skolem_constants():
+    # ∀x (P(x) ∨ ∃y Q(y)) only needs a Skolem constant once ∃y leaves the scope of ∀x
+    x = Var("x", UNIVERSAL)
+    y = Var("y", EXISTENTIAL)
+    f = ForAll(x, Or(Literal("P", (x,)), Exists(y, Literal("Q", (y,)))))
+    [clause] = clausal_form_converter(f)
+    q = next(l for l in clause.literals if l.name == "Q")
+    assert isinstance(q.args[0], Var) and q.args[0].type == CONSTANT
+
+def test_nested_existential_depends_on_outer_skolem_arguments():
+    # ∀x∃y (P(x, y) ∧ ∃z Q(y, z)): z depends on x through y, so it cannot be a constant
+    x = Var("x", UNIVERSAL)
+    y = Var("y", EXISTENTIAL)
+    z = Var("z", EXISTENTIAL)
+    f = ForAll(x, Exists(y, And(Literal("P", (x, y)), Exists(z, Literal("Q", (y, z))))))
+    clauses = clausal_form_converter(f)
+    p = next(l for c in clauses for l in c.literals if l.name == "P")
+    q = next(l for c in clauses for l in c.literals if l.name == "Q")
+    assert isinstance(q.args[1], Function)
+    assert q.args[1].args == (p.args[0],)
+
+def test_nested_existential_non_theorem_not_proved():
+    from formula_parser import parse_formula
+    from resolution import prove, ProofStatus, ProofLimits
+    # The axiom together with the negated conclusion is satisfiable, so no refutation may exist
+    kb = KB(clausal_form_converter(parse_formula("∀x, ∃y, P(x, y) ∧ ∃z, Q(y, z)")))
+    kb.add_clauses(clausal_form_converter(parse_formula("¬(∃z, ∀x, ∃y, P(x, y) ∧ Q(y, z))")))
+    result = prove(kb, Clause(frozenset()), limits=ProofLimits(max_generated=2000))
+    assert result.status != ProofStatus.PROVED
@@ -0,0 +1,72 @@
+import io
+import sys
+import pytest
+from logic_syntax import Var, Function, Not, And, Or, Implies, Iff, ForAll, Exists
+from structure import Literal
+from formula_parser import parse_formula, parse_stream, tokenize, format_ascii, ParseError
+
+UNIVERSAL = "u"
+EXISTENTIAL = "e"
+CONSTANT = "c"
+
+
+def test_parse_quantified_implication():
+    x = Var("x", UNIVERSAL)
+    f = parse_formula("∀x, (P(x) → Q(x))")
+    assert f == ForAll(x, Implies(Literal("P", (x,)), Literal("Q", (x,))))
+
+def test_constants_and_functions():
+    y = Var("y", EXISTENTIAL)
+    f = parse_formula("∃y, R(a, f(y))")
+    assert f == Exists(y, Literal("R", (Var("a", CONSTANT), Function("f", (y,)))))
+
+def test_negated_atom_is_negative_literal():
+    assert parse_formula("¬P()") == Literal("P", (), positive=False)
+    assert parse_formula("¬(A ∧ B)") == Not(And(Literal("A", ()), Literal("B", ())))
+
+def test_precedence_and_associativity():
+    A, B, C = (Literal(n, ()) for n in "ABC")
+    assert parse_formula("A ∨ B ∧ C") == Or(A, And(B, C))
+    assert parse_formula("A → B → C") == Implies(A, Implies(B, C))
+    assert parse_formula("A ∧ B ∧ C") == And(And(A, B), C)
+    assert parse_formula("A ↔ B ∨ C") == Iff(A, Or(B, C))
+
+def test_ascii_syntax():
+    x = Var("x", UNIVERSAL)
+    unicode = parse_formula("∀x, (¬P(x) ∨ (Q(x) ↔ R(x)))")
+    assert parse_formula("forall x, (~P(x) | (Q(x) <-> R(x)))") == unicode
+    assert parse_formula(format_ascii(unicode)) == unicode
+
+@pytest.mark.parametrize("f", [
+    ForAll(Var("x", UNIVERSAL), Implies(Literal("P", (Var("x", UNIVERSAL),)), Literal("Q", (Var("x", UNIVERSAL),)))),
+    And(ForAll(Var("x", UNIVERSAL), Literal("P", (Var("x", UNIVERSAL),))), Literal("Q", ())),
+    Or(Not(Exists(Var("y", EXISTENTIAL), Literal("P", (Var("y", EXISTENTIAL),)))), Literal("Q", ())),
+    Iff(Literal("A", ()), Not(And(Literal("B", ()), Literal("C", (Function("g", (Var("k", CONSTANT),)),))))),
+])
+def test_round_trip(f):
+    assert parse_formula(str(f)) == f
+
+def test_inner_binding_shadows_outer():
+    f = parse_formula("∀x, (P(x) ∧ ∃x, Q(x))")
+    assert f.sub.left.args[0].type == UNIVERSAL
+    assert f.sub.right.sub.args[0].type == EXISTENTIAL
+
+def test_symbols_are_shared():
+    f = parse_formula("∀x, (P(x) → P(x))")
+    assert f.sub.provided.args[0] is f.sub.then.args[0]
+    _, texts = tokenize("Predicate(a)")
+    assert texts[0] is sys.intern("".join(["Pred", "icate"]))
+
+def test_parse_stream_skips_comments_and_joins_lines():
+    text = io.StringIO("# rules\nP(a)\n\n∀x, (P(x) →\n  Q(x))\nR()\n")
+    formulas = list(parse_stream(text))
+    assert len(formulas) == 3
+    assert isinstance(formulas[1], ForAll)
+
+def test_errors_report_line():
+    with pytest.raises(ParseError, match="line 2"):
+        list(parse_stream(["P(a)", "P(a) ∧ $"]))
+    with pytest.raises(ParseError):
+        parse_formula("(P(a) ∧ Q(b)")
+    with pytest.raises(ParseError):
+        parse_formula("P(a) Q(b)")
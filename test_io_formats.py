@@ -0,0 +1,112 @@
+import io
+import pytest
+from logic_syntax import Var, Function, ForAll
+from structure import Literal, Clause, KB
+from dimacs import read_dimacs, load_dimacs, write_dimacs
+from tptp import read_tptp, tptp_clauses, load_tptp, write_tptp
+from resolution import prove, ProofStatus
+
+UNIVERSAL = "u"
+CONSTANT = "c"
+
+DIMACS = """c example
+p cnf 3 3
+1 -2 0
+2 3
+ -1 0
+-3 0
+"""
+
+# DIMACS tests
+
+def test_read_dimacs_streams_clauses():
+    clauses = list(read_dimacs(io.StringIO(DIMACS)))
+    assert clauses[0] == Clause(frozenset({Literal("p1", ()), Literal("p2", (), False)}))
+    assert clauses[1] == Clause(frozenset({Literal("p2", ()), Literal("p3", ()), Literal("p1", (), False)}))
+    assert len(clauses) == 3
+
+def test_dimacs_round_trip():
+    kb = KB()
+    assert load_dimacs(io.StringIO(DIMACS), kb) == 3
+    out = io.StringIO()
+    write_dimacs(kb, out)
+    assert out.getvalue().startswith("p cnf 3 3\n")
+
+    again = KB()
+    load_dimacs(io.StringIO(out.getvalue()), again)
+    assert set(again.clauses) == set(kb.clauses)
+
+def test_write_dimacs_numbers_other_names():
+    kb = KB([Clause(frozenset({Literal("rain", ()), Literal("p1", (), False)}))])
+    out = io.StringIO()
+    numbers = write_dimacs(kb, out)
+    assert numbers == {"p1": 1, "rain": 2}
+
+def test_write_dimacs_rejects_first_order():
+    kb = KB([Clause(frozenset({Literal("P", (Var("a", CONSTANT),))}))])
+    with pytest.raises(ValueError):
+        write_dimacs(kb, io.StringIO())
+
+# TPTP tests
+
+TPTP = """% Socrates
+fof(men_are_mortal, axiom, ! [X] : (man(X) => mortal(X))).
+cnf(socrates, axiom, man(socrates)).
+/* a block
+   comment */
+fof(goal, conjecture, ? [Y] : mortal(Y)).
+"""
+
+def test_read_tptp_statements():
+    items = list(read_tptp(io.StringIO(TPTP)))
+    assert [(i.language, i.name, i.role) for i in items] == [
+        ("fof", "men_are_mortal", "axiom"),
+        ("cnf", "socrates", "axiom"),
+        ("fof", "goal", "conjecture"),
+    ]
+    assert isinstance(items[0].formula, ForAll)
+    assert items[1].formula == Clause(frozenset({Literal("man", (Var("socrates", CONSTANT),))}))
+
+def test_load_tptp_and_prove():
+    kb = KB()
+    goals = load_tptp(io.StringIO(TPTP), kb)
+    assert len(kb) == 2
+    assert len(goals) == 1
+    for c in goals:
+        kb.add_clause(c)
+    assert prove(kb, Clause(frozenset())).status is ProofStatus.PROVED
+
+def test_tptp_cnf_details():
+    text = "cnf(c1, axiom, (X = f(X) | ~p(X, 'a b')), file('x.p', c1)).\ncnf(c2, axiom, $true | p(a)).\n"
+    clauses = [c for _, c in tptp_clauses(io.StringIO(text))]
+    assert len(clauses) == 1
+    lits = {(l.name, l.positive) for l in clauses[0].literals}
+    assert lits == {("=", True), ("p", False)}
+
+def test_tptp_rejects_trailing_tokens():
+    # Mixed connectives need parentheses in TPTP, the | r must not be dropped quietly
+    with pytest.raises(ValueError):
+        list(read_tptp(io.StringIO("fof(a, axiom, p & q | r).\n")))
+    with pytest.raises(ValueError):
+        list(read_tptp(io.StringIO("cnf(a, axiom, p(a) q(b)).\n")))
+
+def test_tptp_round_trip():
+    # Variables already carry TPTP names, everything else gets quoted on the way out as needed
+    x = Var("X1", UNIVERSAL)
+    kb = KB([
+        Clause(frozenset({Literal("Man", (x,), False), Literal("q", (Function("f", (x,)), Var("a", CONSTANT)))})),
+        Clause(frozenset({Literal("it's", (Var("Big Ben", CONSTANT),))})),
+        Clause(frozenset()),
+    ])
+    out = io.StringIO()
+    assert write_tptp(kb, out) == 3
+    back = KB()
+    assert load_tptp(io.StringIO(out.getvalue()), back) == []
+    assert set(back.clauses) == set(kb.clauses)
+
+def test_tptp_include(tmp_path):
+    (tmp_path / "Axioms").mkdir()
+    (tmp_path / "Axioms" / "ax.ax").write_text("cnf(a1, axiom, p(a)).\ncnf(a2, axiom, q(a)).\n")
+    text = "include('Axioms/ax.ax', [a2]).\ncnf(g, negated_conjecture, ~q(a)).\n"
+    names = [i.name for i in read_tptp(io.StringIO(text), include_root=str(tmp_path))]
+    assert names == ["a2", "g"]
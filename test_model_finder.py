@@ -0,0 +1,98 @@
+import time
+from logic_syntax import Var, Function
+from structure import Literal, Clause, KB
+from formula_parser import parse_formula
+from clausal_form import clausal_form_converter
+from resolution import prove, refutation_proof, negate_goal, ProofStatus, ProofLimits
+from model_finder import find_model, flatten, _solve
+
+UNIVERSAL = "u"
+CONSTANT = "c"
+
+x = Var("x", UNIVERSAL)
+a = Var("a", CONSTANT)
+
+
+def _clauses(*formulas: str) -> list[Clause]:
+    return [c for text in formulas for c in clausal_form_converter(parse_formula(text))]
+
+def _kb(*formulas: str) -> KB:
+    return KB(_clauses(*formulas))
+
+def _goal(text: str) -> Clause:
+    [clause] = clausal_form_converter(parse_formula(text))
+    return clause
+
+
+def test_flatten_names_every_subterm():
+    # P(f(a)) becomes a ≠ v0 ∨ f(v0) ≠ v1 ∨ P(v1)
+    nvars, literals = flatten(Clause(frozenset({Literal("P", (Function("f", (a,)),))})))
+    assert nvars == 2
+    assert sorted(lit[0] for lit in literals) == ["F", "F", "P"]
+
+def test_solver():
+    assert _solve(2, [[1, 2], [-1, 2], [1, -2]]) == [0, 1, 1]
+    assert _solve(2, [[1, 2], [-1, 2], [1, -2], [-1, -2]]) is None
+
+def test_finds_smallest_model():
+    clauses = _clauses("P(a)", "¬P(b)")
+    model = find_model(clauses)
+    assert model.size == 2
+    assert all(model.satisfies(c) for c in clauses)
+
+def test_infinite_chain_has_finite_model():
+    # Resolution keeps deriving P(f(f(...(a)))) and never saturates
+    clauses = _clauses("P(a)", "∀x, P(x) → P(f(x))", "∀x, ¬(f(x) = x)")
+    model = find_model(clauses)
+    assert model.size == 2
+    assert all(model.satisfies(c) for c in clauses)
+
+def test_no_model_within_bound():
+    assert find_model(_clauses("P(a)", "¬P(a)")) is None
+    assert find_model(_clauses("a = b", "b = c", "P(a)", "¬P(c)")) is None
+    # Three distinct constants need three elements
+    assert find_model(_clauses("¬(a = b)", "¬(b = c)", "¬(a = c)"), max_size=2) is None
+    assert find_model(_clauses("¬(a = b)", "¬(b = c)", "¬(a = c)"), max_size=3).size == 3
+
+def test_prove_returns_countermodel():
+    kb = _kb("P(a)", "∀x, P(x) → P(f(x))")
+    goal = _goal("Q(a)")
+    result = prove(kb, goal, limits=ProofLimits(max_generated=1000), model_size=3)
+    assert result.status == ProofStatus.DISPROVED
+    assert all(result.model.satisfies(c) for c in kb.clauses + negate_goal(goal))
+    assert prove(kb, goal, limits=ProofLimits(max_generated=1000)).status == ProofStatus.UNKNOWN
+    assert not refutation_proof(kb, goal, model_size=3)
+
+def test_theorem_still_proved():
+    result = prove(_kb("P(a)", "∀x, P(x) → Q(x)"), _goal("Q(a)"), model_size=3)
+    assert result.status == ProofStatus.PROVED and result.model is None
+
+def test_group_countermodel():
+    # Associativity alone does not make an operation commutative, m(x, y) = x is a 2 element counterexample
+    axioms = _kb("∀x, ∀y, ∀z, m(m(x, y), z) = m(x, m(y, z))")
+    result = prove(axioms, _goal("m(a, b) = m(b, a)"), limits=ProofLimits(max_generated=2000), model_size=3)
+    assert result.status == ProofStatus.DISPROVED and result.model.size == 2
+
+def test_grounding_honours_limits():
+    # Six variables over four elements is thousands of instances before the solver even starts
+    calls = []
+    def stop():
+        calls.append(1)
+        if len(calls) > 2:
+            raise TimeoutError
+    clauses = _clauses("∀u, ∀v, ∀w, ∀x, ∀y, ∀z, R(u, v, w) ∨ R(x, y, z) ∨ S(u, z)")
+    try:
+        find_model(clauses + _clauses("¬R(a, a, a)"), min_size=4, max_size=4, stop=stop)
+    except TimeoutError:
+        pass
+    assert len(calls) == 3
+
+def test_prove_time_limit_covers_model_search():
+    # Eight distinct constants rule out every smaller model, and each size grounds size ** 7 instances
+    names = [f"c{i}" for i in range(8)]
+    kb = _kb("∀t, ∀u, ∀v, ∀w, ∀x, ∀y, ∀z, R(u, v, w) ∨ R(x, y, z) ∨ ¬S(u, t)",
+             *(f"¬({p} = {q})" for i, p in enumerate(names) for q in names[i + 1:]))
+    started = time.perf_counter()
+    result = prove(kb, _goal("Q(a)"), limits=ProofLimits(max_seconds=0.2), model_size=9)
+    assert result.status == ProofStatus.UNKNOWN and result.reason == "time"
+    assert time.perf_counter() - started < 2
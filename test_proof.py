@@ -0,0 +1,60 @@
+from logic_syntax import Var, ForAll, Implies
+from structure import Literal, Clause, KB
+from clausal_form import clausal_form_converter
+from proof import Provenance, INPUT, RESOLVE
+from resolution import prove, ProofStatus
+
+UNIVERSAL = "u"
+CONSTANT = "c"
+
+
+def test_proof_ends_with_empty_clause():
+    x = Var("x", UNIVERSAL)
+    socrates = Var("socrates", CONSTANT)
+    kb = KB()
+    for f in [ForAll(x, Implies(Literal("Man", (x,)), Literal("Mortal", (x,)))), Literal("Man", (socrates,))]:
+        for c in clausal_form_converter(f):
+            kb.add_clause(c)
+
+    result = prove(kb, Clause(frozenset({Literal("Mortal", (socrates,))})), record_proof=True)
+    assert result.status is ProofStatus.PROVED
+    proof = result.proof
+    assert not proof.steps[-1].clause.literals
+    assert {s.rule for s in proof.steps} >= {"input", "goal", "resolve"}
+    assert any(s.unifier and socrates in s.unifier.values() for s in proof.steps)
+
+    text = str(proof)
+    assert "□" in text
+    assert "Mortal(socrates)" in text
+
+def test_proof_keeps_only_ancestors():
+    P, Q, R, S = (Literal(n, ()) for n in "PQRS")
+    kb = KB([
+        Clause(frozenset({P})),
+        Clause(frozenset({P.negate(), Q})),
+        Clause(frozenset({R, S})),
+        Clause(frozenset({R.negate(), S})),
+    ])
+    proof = prove(kb, Clause(frozenset({Q})), record_proof=True).proof
+    names = {lit.name for step in proof.steps for lit in step.clause.literals}
+    assert names <= {"P", "Q"}
+
+def test_no_proof_unless_requested():
+    P = Literal("P", ())
+    result = prove(KB([Clause(frozenset({P}))]), Clause(frozenset({P})))
+    assert result and result.proof is None
+
+def test_provenance_release_collects_ancestors():
+    a = Clause(frozenset({Literal("A", ())}))
+    b = Clause(frozenset({Literal("A", (), False), Literal("B", ())}))
+    c = Clause(frozenset({Literal("B", ())}))
+    prov = Provenance()
+    prov.record(0, a, INPUT)
+    prov.record(1, b, INPUT)
+    prov.record(2, c, RESOLVE, 0, 1)
+
+    prov.release(0)
+    assert len(prov) == 3  # still an ancestor of clause 2
+    prov.release(2)
+    assert len(prov) == 1  # only clause 1 is still live
+    assert prov.extract(1).steps[0].clause == b
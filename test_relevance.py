@@ -0,0 +1,96 @@
+from logic_syntax import Var, ForAll, Implies
+from structure import Literal, Clause, KB
+from clausal_form import clausal_form_converter
+from relevance import relevant_clauses, relevance_filter
+from resolution import prove, negate_goal, ProofStatus
+
+UNIVERSAL = "u"
+CONSTANT = "c"
+
+
+def _chain_kb(noise: int) -> KB:
+    # P(a), P→Q, Q→R plus unrelated rules Ni→Mi
+    x = Var("x", UNIVERSAL)
+    a = Var("a", CONSTANT)
+    formulas = [
+        Literal("P", (a,)),
+        ForAll(x, Implies(Literal("P", (x,)), Literal("Q", (x,)))),
+        ForAll(x, Implies(Literal("Q", (x,)), Literal("R", (x,)))),
+    ]
+    for i in range(noise):
+        formulas.append(ForAll(x, Implies(Literal(f"N{i}", (x,)), Literal(f"M{i}", (x,)))))
+    kb = KB()
+    for f in formulas:
+        for c in clausal_form_converter(f):
+            kb.add_clause(c)
+    return kb
+
+def test_predicate_index():
+    P = Literal("P", ())
+    c = Clause(frozenset({P, P.negate()}))
+    kb = KB([c])
+    assert kb.clauses_with("P", True) == [c]
+    assert kb.clauses_with("P", False) == [c]
+    assert kb.clauses_with("Q", True) == []
+
+def test_relevant_clauses_follow_chain():
+    kb = _chain_kb(20)
+    a = Var("a", CONSTANT)
+    goal = Clause(frozenset({Literal("R", (a,))}))
+    selected = relevant_clauses(kb, negate_goal(goal))
+
+    names = {lit.name for c in selected for lit in c.literals}
+    assert names == {"P", "Q", "R"}
+    assert len(selected) == 3
+
+def test_relevant_clauses_depth_bound():
+    kb = _chain_kb(0)
+    a = Var("a", CONSTANT)
+    goal = Clause(frozenset({Literal("R", (a,))}))
+    selected = relevant_clauses(kb, negate_goal(goal), max_depth=1)
+    assert len(selected) == 1
+    assert relevance_filter(kb, negate_goal(goal), max_depth=1)[1]
+    assert not relevance_filter(kb, negate_goal(goal), max_depth=3)[1]
+
+def test_prove_with_relevance_and_set_of_support():
+    kb = _chain_kb(50)
+    a = Var("a", CONSTANT)
+    goal = Clause(frozenset({Literal("R", (a,))}))
+    result = prove(kb, goal, relevance=True, set_of_support=True)
+
+    assert result.status is ProofStatus.PROVED
+    assert result.stats.filtered == 50
+    assert result.stats.input_clauses == 4
+
+def test_set_of_support_does_not_resolve_axioms_together():
+    P, Q = Literal("P", ()), Literal("Q", ())
+    kb = KB([Clause(frozenset({P})), Clause(frozenset({P.negate(), Q}))])
+    result = prove(kb, Clause(frozenset({Literal("S", ())})), set_of_support=True)
+    assert result.status is ProofStatus.UNKNOWN and result.reason == "set_of_support"
+    assert result.stats.generated == 0
+
+def test_depth_bound_cut_is_not_a_disproof():
+    kb = _chain_kb(0)
+    a = Var("a", CONSTANT)
+    goal = Clause(frozenset({Literal("R", (a,))}))
+    result = prove(kb, goal, relevance=True, relevance_depth=1)
+    assert result.status is ProofStatus.UNKNOWN and result.reason == "relevance"
+    assert prove(kb, goal, relevance=True).status is ProofStatus.PROVED
+    # Without a cut the clauses left out can still be inconsistent
+    other = Clause(frozenset({Literal("T", (a,))}))
+    result = prove(kb, other, relevance=True, relevance_depth=1)
+    assert result.status is ProofStatus.UNKNOWN and result.reason == "relevance"
+
+def test_restricted_saturation_is_not_a_disproof():
+    # Inconsistent axioms prove every goal, though neither restriction lets P meet ¬P
+    P, Q = Literal("P", ()), Literal("Q", ())
+    kb = KB([Clause(frozenset({P})), Clause(frozenset({P.negate()}))])
+    goal = Clause(frozenset({Q}))
+    assert prove(kb, goal).status is ProofStatus.PROVED
+    result = prove(kb, goal, set_of_support=True)
+    assert result.status is ProofStatus.UNKNOWN and result.reason == "set_of_support"
+    result = prove(kb, goal, relevance=True)
+    assert result.status is ProofStatus.UNKNOWN and result.reason == "relevance"
+    # A filter that keeps every clause leaves a complete search behind
+    kb = KB([Clause(frozenset({P, Q}))])
+    assert prove(kb, Clause(frozenset({P})), relevance=True).status is ProofStatus.DISPROVED
@@ -0,0 +1,194 @@
+import asyncio
+import io
+import threading
+import pytest
+from logic_syntax import Var, Function, ForAll, Implies
+from structure import Literal, Clause, KB
+from clausal_form import clausal_form_converter
+from unification import unify, substitute, subsumes, occurs, term_variables, term_weight
+from resolution import resolve, refutation_proof, prove, prove_async, ProofStats, ProofStatus, ProofLimits, CancelToken
+
+UNIVERSAL = "u"
+CONSTANT = "c"
+
+
+def _kb(*formulas):
+    kb = KB()
+    for f in formulas:
+        for c in clausal_form_converter(f):
+            kb.add_clause(c)
+    return kb
+
+# Unification tests
+
+def test_unify_binds_variable():
+    x = Var("x", UNIVERSAL)
+    a = Var("a", CONSTANT)
+    theta = unify(Function("f", (x,)), Function("f", (a,)))
+    assert substitute(x, theta) == a
+
+def test_unify_occurs_check():
+    x = Var("x", UNIVERSAL)
+    assert unify(x, Function("f", (x,))) is None
+
+def test_unify_constants_clash():
+    assert unify(Var("a", CONSTANT), Var("b", CONSTANT)) is None
+
+def test_subsumes_instance():
+    x = Var("x", UNIVERSAL)
+    a = Var("a", CONSTANT)
+    general = Clause(frozenset({Literal("P", (x,))}))
+    specific = Clause(frozenset({Literal("P", (a,)), Literal("Q", (a,))}))
+    assert subsumes(general, specific)
+    assert not subsumes(specific, general)
+
+def test_subsumes_backtracks_over_shared_bindings():
+    x, y = Var("x", UNIVERSAL), Var("y", UNIVERSAL)
+    a, b = Var("a", CONSTANT), Var("b", CONSTANT)
+    c = Clause(frozenset({Literal("P", (x, y)), Literal("Q", (y,))}))
+    d = Clause(frozenset({Literal("P", (a, a)), Literal("P", (a, b)), Literal("Q", (b,))}))
+    assert subsumes(c, d)
+    # Q(b) has to pick P(a, b), and a missing predicate or sign rules D out at once
+    assert not subsumes(c, Clause(frozenset({Literal("P", (a, a)), Literal("Q", (b,))})))
+    assert not subsumes(c, Clause(frozenset({Literal("P", (a, b)), Literal("Q", (b,), False)})))
+
+def test_term_helpers_handle_deep_terms():
+    x = Var("x", UNIVERSAL)
+    a = Var("a", CONSTANT)
+    t = x
+    for _ in range(5000):
+        t = Function("f", (t,))
+    assert occurs(x, t, {})
+    assert list(term_variables(t)) == [x]
+    assert term_weight(t) == 5001
+    assert unify(x, t) is None
+    u = substitute(t, {x: a})
+    while isinstance(u, Function):
+        u = u.args[0]
+    assert u == a
+
+# Resolution tests
+
+def test_resolve_propositional():
+    P = Literal("P", ())
+    Q = Literal("Q", ())
+    resolvents = resolve(Clause(frozenset({P.negate(), Q})), Clause(frozenset({P})))
+    assert resolvents == [Clause(frozenset({Q}))]
+
+def test_refutation_propositional():
+    P, Q, R = Literal("P", ()), Literal("Q", ()), Literal("R", ())
+    kb = KB([
+        Clause(frozenset({P.negate(), Q})),
+        Clause(frozenset({P, R})),
+        Clause(frozenset({R.negate(), Q})),
+    ])
+    assert refutation_proof(kb, Clause(frozenset({Q})))
+    assert not refutation_proof(kb, Clause(frozenset({P})))
+
+def test_refutation_first_order():
+    x = Var("x", UNIVERSAL)
+    socrates = Var("socrates", CONSTANT)
+    kb = _kb(
+        ForAll(x, Implies(Literal("Man", (x,)), Literal("Mortal", (x,)))),
+        Literal("Man", (socrates,)),
+    )
+    assert refutation_proof(kb, Clause(frozenset({Literal("Mortal", (socrates,))})))
+
+def test_refutation_existential_goal():
+    x = Var("x", UNIVERSAL)
+    a = Var("a", CONSTANT)
+    kb = _kb(Literal("P", (a,)))
+    assert refutation_proof(kb, Clause(frozenset({Literal("P", (x,))})))
+
+# Stats and trace tests
+
+def test_stats_are_filled():
+    x = Var("x", UNIVERSAL)
+    a = Var("a", CONSTANT)
+    kb = _kb(
+        ForAll(x, Implies(Literal("P", (x,)), Literal("Q", (x,)))),
+        ForAll(x, Implies(Literal("Q", (x,)), Literal("R", (x,)))),
+        Literal("P", (a,)),
+    )
+    stats = ProofStats()
+    assert refutation_proof(kb, Clause(frozenset({Literal("R", (a,))})), stats, track_memory=True)
+
+    assert stats.input_clauses == 4
+    assert stats.selected > 0
+    assert stats.unify_attempts >= stats.unify_failures
+    assert 0.0 <= stats.index_hit_rate <= 1.0
+    assert {"preprocess", "select", "infer"} <= set(stats.phase_times)
+    assert stats.peak_memory is not None
+    assert stats.as_dict()["generated"] == stats.generated
+
+def test_trace_is_sampled():
+    P, Q, R = Literal("P", ()), Literal("Q", ()), Literal("R", ())
+    kb = KB([
+        Clause(frozenset({P.negate(), Q})),
+        Clause(frozenset({P, R})),
+        Clause(frozenset({R.negate(), Q})),
+    ])
+    stats = ProofStats()
+    out = io.StringIO()
+    refutation_proof(kb, Clause(frozenset({Q})), stats, trace=out, trace_every=2)
+
+    lines = out.getvalue().splitlines()
+    assert len(lines) == stats.selected // 2
+    assert all(len(line.split("\t")) == 4 for line in lines)
+
+# Limit tests
+
+def _infinite_kb():
+    # P(a) and P(x) → P(f(x)) never saturates
+    x = Var("x", UNIVERSAL)
+    a = Var("a", CONSTANT)
+    return _kb(
+        Literal("P", (a,)),
+        ForAll(x, Implies(Literal("P", (x,)), Literal("P", (Function("f", (x,)),)))),
+    )
+
+def test_prove_tri_state():
+    P, Q = Literal("P", ()), Literal("Q", ())
+    kb = KB([Clause(frozenset({P.negate(), Q})), Clause(frozenset({P}))])
+    assert prove(kb, Clause(frozenset({Q}))).status is ProofStatus.PROVED
+    assert prove(kb, Clause(frozenset({Literal("R", ())}))).status is ProofStatus.DISPROVED
+
+def test_prove_generated_limit():
+    result = prove(_infinite_kb(), Clause(frozenset({Literal("Q", ())})), ProofLimits(max_generated=50))
+    assert result.status is ProofStatus.UNKNOWN
+    assert result.reason == "generated"
+    assert result.stats.generated > 50
+    assert not result
+
+def test_prove_time_limit():
+    result = prove(_infinite_kb(), Clause(frozenset({Literal("Q", ())})), ProofLimits(max_seconds=0.05))
+    assert result.status is ProofStatus.UNKNOWN
+    assert result.reason == "time"
+
+def test_prove_cancel_from_thread():
+    cancel = CancelToken()
+    timer = threading.Timer(0.05, cancel.cancel)
+    timer.start()
+    result = prove(_infinite_kb(), Clause(frozenset({Literal("Q", ())})), cancel=cancel)
+    timer.join()
+    assert result.status is ProofStatus.UNKNOWN
+    assert result.reason == "cancelled"
+
+def test_prove_async_cancellation():
+    async def run():
+        cancel = CancelToken()
+        task = asyncio.create_task(prove_async(_infinite_kb(), Clause(frozenset({Literal("Q", ())})), cancel=cancel))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return cancel
+
+    assert asyncio.run(run()).cancelled
+
+def test_prove_async_forwards_options():
+    kb = KB([Clause(frozenset({Literal("P", ())})), Clause(frozenset({Literal("P", (), False), Literal("Q", ())}))])
+    result = asyncio.run(prove_async(kb, Clause(frozenset({Literal("Q", ())})), record_proof=True, preprocess=True))
+    assert result.status is ProofStatus.PROVED and result.proof is not None
+    result = asyncio.run(prove_async(_infinite_kb(), Clause(frozenset({Literal("Q", ())})), model_size=2))
+    assert result.status is ProofStatus.DISPROVED and result.model is not None
@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+import pytest
+from logic_syntax import Var
+from structure import Literal, Clause
+from sharding import ShardedKB, shard_of
+from resolution import prove, ProofStatus
+
+UNIVERSAL = "u"
+CONSTANT = "c"
+
+x = Var("x", UNIVERSAL)
+a = Var("a", CONSTANT)
+
+
+def _clause(*lits: Literal) -> Clause:
+    return Clause(frozenset(lits))
+
+@pytest.fixture
+def sharded():
+    with ShardedKB(shards=3) as kb:
+        yield kb
+
+def test_routing_and_lookup(sharded):
+    P, Q, R = (Literal(n, (x,)) for n in "PQR")
+    c1 = _clause(P.negate(), Q)
+    c2 = _clause(Q.negate(), R)
+    c3 = _clause(Literal("P", (a,)))
+    assert sharded.add_clauses([c1, c2, c3, c1]) == 3
+    assert len(sharded) == 3
+    assert c2 in sharded
+    assert sharded.clauses_with("Q", True) == [c1]
+    assert sharded.clauses_with("Q", False) == [c2]
+    assert set(sharded.clauses) == {c1, c2, c3}
+
+def test_subsumption_queries(sharded):
+    general = _clause(Literal("P", (x,)))
+    specific = _clause(Literal("P", (a,)), Literal("Q", (a,)))
+    other = _clause(Literal("Q", (x,)), Literal("R", (x,)))
+    sharded.add_clauses([general, specific, other])
+    assert set(sharded.subsumers(specific)) == {general, specific}
+    assert set(sharded.subsumed_by(general)) == {general, specific}
+    assert sharded.subsumed_by(_clause(Literal("R", (a,)))) == []
+
+def test_remove_and_empty_clause(sharded):
+    c = _clause(Literal("P", ()), Literal("Q", ()))
+    empty = Clause(frozenset())
+    sharded.add_clauses([c, empty])
+    assert len(sharded) == 2 and empty in sharded
+    assert sharded.remove_clauses({c, empty}) == 2
+    assert len(sharded) == 0
+    assert sharded.clauses_with("Q", True) == []
+
+def test_prove_on_sharded_kb(sharded):
+    P, Q = Literal("P", (x,)), Literal("Q", (x,))
+    sharded.add_clauses([_clause(P.negate(), Q), _clause(Literal("P", (a,)))])
+    result = prove(sharded, _clause(Literal("Q", (a,))), relevance=True)
+    assert result.status == ProofStatus.PROVED
+
+def test_relevance_prove_never_fetches_every_shard(sharded, monkeypatch):
+    fetches = []
+    full = ShardedKB.clauses.fget
+    monkeypatch.setattr(ShardedKB, "clauses", property(lambda kb: fetches.append(1) or full(kb)))
+    P, Q = Literal("P", (x,)), Literal("Q", (x,))
+    noise = [_clause(Literal(f"N{i}", (x,)).negate(), Literal(f"M{i}", (x,))) for i in range(100)]
+    sharded.add_clauses([_clause(P.negate(), Q), _clause(Literal("P", (a,)))] + noise)
+    result = prove(sharded, _clause(Literal("Q", (a,))), relevance=True)
+    assert result.status == ProofStatus.PROVED and result.stats.filtered == 100
+    assert fetches == []
+
+def test_shard_of_is_stable():
+    assert shard_of("P", 4) == shard_of("P", 4)
+    assert {shard_of(f"P{i}", 4) for i in range(50)} == {0, 1, 2, 3}
+
+@pytest.mark.parametrize("method", ["fork", "spawn"])
+def test_shared_memory_tracking_is_clean(method):
+    # The resource tracker complains on stderr about blocks it lost track of or that leaked
+    script = (
+        "from sharding import ShardedKB\n"
+        "from structure import Literal, Clause\n"
+        "if __name__ == '__main__':\n"
+        f"    with ShardedKB(shards=2, context={method!r}) as kb:\n"
+        "        for i in range(3):\n"
+        "            kb.add_clauses([Clause(frozenset({Literal(f'P{i}{j}', ())})) for j in range(4)])\n"
+        "        assert len(kb) == 12\n"
+    )
+    done = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                          capture_output=True, text=True, timeout=60)
+    assert done.returncode == 0, done.stderr
+    assert "KeyError" not in done.stderr and "leaked" not in done.stderr
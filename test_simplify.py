@@ -0,0 +1,112 @@
+from logic_syntax import Var
+from structure import Literal, Clause, KB
+from simplify import (simplify, merge_duplicate_literals, unit_propagate, eliminate_pure,
+                      eliminate_blocked, eliminate_predicates, SimplifyStats)
+from formula_parser import parse_formula
+from clausal_form import clausal_form_converter
+from resolution import prove, ProofStatus, ProofLimits
+
+UNIVERSAL = "u"
+CONSTANT = "c"
+
+P, Q, R, S = (Literal(n, ()) for n in "PQRS")
+
+
+def _clause(*lits):
+    return Clause(frozenset(lits))
+
+def test_remove_clause_keeps_indexes():
+    c1, c2 = _clause(P, Q), _clause(P.negate())
+    kb = KB([c1, c2])
+    assert kb.remove_clause(c1)
+    assert not kb.remove_clause(c1)
+    assert kb.clauses == [c2]
+    assert Q not in kb.index
+    assert kb.clauses_with("P", True) == []
+    assert kb.clauses_with("P", False) == [c2]
+
+def test_merge_duplicate_literals():
+    x = Var("x", UNIVERSAL)
+    a = Var("a", CONSTANT)
+    c = _clause(Literal("P", (x,)), Literal("P", (a,)))
+    assert merge_duplicate_literals(c) == _clause(Literal("P", (a,)))
+
+def test_unit_propagation_chain():
+    kb = KB([_clause(P), _clause(P.negate(), Q), _clause(Q.negate(), R), _clause(P, S)])
+    stats = SimplifyStats()
+    assert unit_propagate(kb, stats)
+    assert set(kb.clauses) == {_clause(P), _clause(Q), _clause(R)}
+    assert stats.unit_subsumed == 1
+    assert stats.unit_deleted == 2
+
+def test_unit_propagation_finds_contradiction():
+    x = Var("x", UNIVERSAL)
+    a = Var("a", CONSTANT)
+    kb = KB([_clause(Literal("P", (x,))), _clause(Literal("P", (a,), False), Q), _clause(Q.negate())])
+    unit_propagate(kb)
+    assert Clause(frozenset()) in kb
+
+def test_eliminate_pure():
+    kb = KB([_clause(P, Q), _clause(Q.negate(), R), _clause(R.negate())])
+    assert eliminate_pure(kb)
+    assert _clause(P, Q) not in kb
+
+def test_eliminate_blocked():
+    kb = KB([_clause(P, Q), _clause(P.negate(), Q.negate())])
+    assert eliminate_blocked(kb)
+    assert len(kb) == 0
+
+def test_eliminate_predicates():
+    kb = KB([_clause(P.negate(), Q), _clause(Q.negate(), R), _clause(S, R.negate())])
+    stats = SimplifyStats()
+    assert eliminate_predicates(kb, stats)
+    assert stats.eliminated > stats.resolvents
+    assert all("Q" not in {l.name for l in c.literals} for c in kb.clauses)
+
+def test_simplify_keeps_models_by_default():
+    kb = KB([_clause(P, Q), _clause(Q.negate(), R)])
+    simplify(kb)
+    assert len(kb) == 2
+
+def test_prove_with_preprocessing():
+    kb = KB([_clause(P), _clause(P.negate(), Q), _clause(Q.negate(), R), _clause(S, R.negate())])
+    result = prove(kb, _clause(R), preprocess=True)
+    assert result.status is ProofStatus.PROVED
+    assert prove(kb, _clause(Literal("T", ())), preprocess=True).status is ProofStatus.DISPROVED
+
+def test_inprocessing_unit_deletion_keeps_proofs():
+    x = Var("x", UNIVERSAL)
+    a = Var("a", CONSTANT)
+    kb = KB([
+        _clause(Literal("P", (x,))),
+        _clause(Literal("P", (x,), False), Literal("Q", (x,)), R),
+        _clause(R.negate()),
+    ])
+    result = prove(kb, _clause(Literal("Q", (a,))), record_proof=True)
+    assert result.status is ProofStatus.PROVED
+    assert result.stats.unit_deleted > 0
+    assert not result.proof.steps[-1].clause.literals
+
+def test_condensing_with_swapped_variables():
+    # P(x, y) ∨ P(y, x) matches onto itself with x ↦ y, y ↦ x, which is no smaller clause
+    x = Var("x", UNIVERSAL)
+    y = Var("y", UNIVERSAL)
+    c = _clause(Literal("P", (x, y)), Literal("P", (y, x)))
+    assert merge_duplicate_literals(c) == c
+
+def test_preprocessing_totality_axiom():
+    x = Var("x", UNIVERSAL)
+    y = Var("y", UNIVERSAL)
+    a = Var("a", CONSTANT)
+    kb = KB([_clause(Literal("L", (x, y)), Literal("L", (y, x)))])
+    result = prove(kb, _clause(Literal("L", (a, a))), preprocess=True, limits=ProofLimits(max_seconds=2))
+    assert result.status is ProofStatus.PROVED
+
+def test_proof_after_unit_simplification_with_shared_variables():
+    clauses = clausal_form_converter(parse_formula(
+        "(∀y, g(y, g(b, y)) ≠ y ∨ y ≠ y) ∧ (P(a) ∨ c ≠ c) ∧ (∀x, b = f(f(x)) ∨ ¬Q(b, g(b, a)))"
+        " ∧ (∀y, b = g(f(a), g(a, y))) ∧ (∀x, x = f(a))"))
+    result = prove(KB(clauses), _clause(), equality=True, record_proof=True,
+                   limits=ProofLimits(max_generated=5000))
+    assert result.status is ProofStatus.PROVED
+    assert not result.proof.steps[-1].clause.literals
@@ -0,0 +1,71 @@
+import threading
+from structure import Literal, Clause, KB
+from resolution import prove, ProofStatus
+
+
+def _unit(name: str, positive: bool = True) -> Clause:
+    return Clause(frozenset({Literal(name, (), positive)}))
+
+def test_snapshot_ignores_later_additions():
+    kb = KB([_unit("P"), _unit("Q")])
+    snap = kb.snapshot()
+    kb.add_clause(_unit("R"))
+    kb.add_clause(_unit("P", False))
+    assert snap.clauses == [_unit("P"), _unit("Q")]
+    assert len(snap) == 2
+    assert _unit("R") not in snap
+    assert snap.clauses_with("P", False) == []
+    assert kb.snapshot().clauses_with("P", False) == [_unit("P", False)]
+
+def test_snapshot_keeps_removed_clauses():
+    kb = KB([_unit("P"), _unit("Q"), _unit("R")])
+    snap = kb.snapshot()
+    kb.remove_clause(_unit("Q"))
+    assert _unit("Q") in snap
+    assert snap.clauses_with("Q", True) == [_unit("Q")]
+    after = kb.snapshot()
+    assert _unit("Q") not in after
+    assert after.clauses == kb.clauses
+
+def test_snapshot_survives_compaction():
+    kb = KB([_unit(f"P{i}") for i in range(10)])
+    snap = kb.snapshot()
+    kb.remove_clauses({_unit(f"P{i}") for i in range(8)})
+    kb.add_clause(_unit("P0"))
+    assert len(snap) == 10
+    assert kb.snapshot().clauses == kb.clauses == [_unit("P8"), _unit("P9"), _unit("P0")]
+
+def test_kb_reads_skip_removed_log_entries():
+    # Three of eight removed stays below the compaction threshold, so the log still holds them
+    kb = KB([_unit(f"P{i}") for i in range(7)] + [_unit("P0", False)])
+    kb.remove_clauses({_unit("P1"), _unit("P2"), _unit("P0", False)})
+    assert kb.clauses == [_unit("P0")] + [_unit(f"P{i}") for i in range(3, 7)]
+    assert len(kb) == 5
+    assert _unit("P1") not in kb and _unit("P3") in kb
+    assert kb.clauses_with("P1", True) == [] and kb.clauses_with("P0", True) == [_unit("P0")]
+    assert ("P0", False) not in kb.predicates() and ("P0", True) in kb.predicates()
+    kb.add_clause(_unit("P1"))
+    assert kb.clauses_with("P1", True) == [_unit("P1")] and len(kb) == 6
+
+def test_prove_against_snapshot_while_writing():
+    # P, P→Q in the snapshot, the writer keeps adding unrelated facts meanwhile
+    P, Q = Literal("P", ()), Literal("Q", ())
+    kb = KB([Clause(frozenset({P})), Clause(frozenset({P.negate(), Q}))])
+    snap = kb.snapshot()
+    done = threading.Event()
+
+    def writer():
+        i = 0
+        while not done.is_set():
+            kb.add_clause(_unit(f"N{i}"))
+            i += 1
+
+    t = threading.Thread(target=writer)
+    t.start()
+    try:
+        results = [prove(snap, Clause(frozenset({Q}))).status for _ in range(20)]
+    finally:
+        done.set()
+        t.join()
+    assert results == [ProofStatus.PROVED] * 20
+    assert len(snap) == 2
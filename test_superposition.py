@@ -0,0 +1,135 @@
+from logic_syntax import Var, Function
+from structure import Literal, Clause, KB
+from formula_parser import parse_formula
+from clausal_form import clausal_form_converter
+from simplify import eliminate_pure
+from resolution import prove, ProofStatus, ProofLimits, ProofStats
+from superposition import (equation, kbo_greater, superpositions, equality_resolvents, equality_factors,
+                           Demodulators, is_trivial)
+
+UNIVERSAL = "u"
+CONSTANT = "c"
+
+x = Var("x", UNIVERSAL)
+y = Var("y", UNIVERSAL)
+a = Var("a", CONSTANT)
+b = Var("b", CONSTANT)
+
+def f(*args):
+    return Function("f", args)
+
+def m(s, t):
+    return Function("m", (s, t))
+
+def _clause(*lits: Literal) -> Clause:
+    return Clause(frozenset(lits))
+
+def _kb(*formulas: str) -> KB:
+    kb = KB()
+    for text in formulas:
+        kb.add_clauses(clausal_form_converter(parse_formula(text)))
+    return kb
+
+def _goal(text: str) -> Clause:
+    [clause] = clausal_form_converter(parse_formula(text))
+    return clause
+
+
+def test_kbo():
+    assert kbo_greater(f(x), x)
+    assert not kbo_greater(x, f(x))
+    assert kbo_greater(f(a), a)
+    assert not kbo_greater(f(x), y)             # y does not occur on the left
+    assert kbo_greater(m(m(x, y), a), m(x, m(y, a)))
+    assert not kbo_greater(m(x, y), m(y, x))    # commutativity cannot be oriented
+    assert kbo_greater(m(b, a), m(a, b))
+
+def test_superposition_rewrites_subterm():
+    # f(a) = b and P(f(x)) give P(b)
+    c1 = _clause(equation(f(a), b))
+    c2 = _clause(Literal("P", (f(x),)))
+    results = [c for c, _ in superpositions(c1, equation(f(a), b), c2)]
+    assert results == [_clause(Literal("P", (b,)))]
+
+def test_superposition_respects_ordering():
+    # Rewriting a into f(a) would make the term bigger
+    eq = equation(f(a), a)
+    results = [c for c, _ in superpositions(_clause(eq), eq, _clause(Literal("P", (a,))))]
+    assert _clause(Literal("P", (f(a),))) not in results
+
+def test_equality_resolution_and_factoring():
+    c = _clause(equation(f(x), f(a), False), Literal("Q", (x,)))
+    assert [r for r, _ in equality_resolvents(c)] == [_clause(Literal("Q", (a,)))]
+    d = _clause(equation(x, a), equation(b, a))
+    assert _clause(equation(a, a, False), equation(b, a)) in [r for r, _ in equality_factors(d)]
+
+def test_demodulators_orient_and_rewrite():
+    demods = Demodulators()
+    assert demods.add(1, _clause(equation(x, f(x, a))))    # oriented right to left
+    assert not demods.add(2, _clause(Literal("P", (a,))))
+    rewritten, cid, _ = demods.rewrite_once(_clause(Literal("P", (f(b, a),))))
+    assert cid == 1 and rewritten == _clause(Literal("P", (b,)))
+    demods.remove(1)
+    assert demods.rewrite_once(_clause(Literal("P", (f(b, a),)))) is None
+
+def test_ordered_rewriting_with_commutativity():
+    demods = Demodulators()
+    demods.add(1, _clause(equation(m(x, y), m(y, x))))
+    target = _clause(Literal("P", (m(b, a),)))
+    rewritten, _, _ = demods.rewrite_once(target)
+    assert rewritten == _clause(Literal("P", (m(a, b),)))
+    assert demods.rewrite_once(rewritten) is None
+
+def test_equality_chain():
+    result = prove(_kb("a = b", "b = c", "P(a)"), _goal("P(c)"))
+    assert result.status == ProofStatus.PROVED
+
+def test_demodulation_proves_by_rewriting():
+    stats = ProofStats()
+    result = prove(_kb("f(a) = a"), _goal("f(f(f(a))) = a"), stats=stats)
+    assert result.status == ProofStatus.PROVED
+    assert stats.rewrites >= 3
+
+def test_group_right_identity():
+    axioms = _kb("∀x, m(e, x) = x", "∀x, m(i(x), x) = e", "∀x, ∀y, ∀z, m(m(x, y), z) = m(x, m(y, z))")
+    result = prove(axioms, _goal("m(a, e) = a"), limits=ProofLimits(max_generated=5000), record_proof=True)
+    assert result.status == ProofStatus.PROVED
+    assert {"superpose", "demodulate"} <= {step.rule for step in result.proof.steps}
+
+def test_boolean_group_is_commutative():
+    axioms = _kb("∀x, m(x, x) = e", "∀x, m(e, x) = x", "∀x, m(x, e) = x",
+                 "∀x, ∀y, ∀z, m(m(x, y), z) = m(x, m(y, z))")
+    result = prove(axioms, _goal("m(a, b) = m(b, a)"), limits=ProofLimits(max_generated=5000))
+    assert result.status == ProofStatus.PROVED
+
+def test_distinct_constants_not_proved_equal():
+    result = prove(_kb("P(a)", "¬P(b)"), _goal("a = b"), limits=ProofLimits(max_generated=1000))
+    assert result.status == ProofStatus.DISPROVED
+
+def test_equality_syntax():
+    lit = parse_formula("f(a) ≠ b")
+    assert lit == equation(f(a), b, False)
+    assert str(lit) == "f(a) ≠ b"
+    assert is_trivial(_clause(equation(a, a), Literal("P", ())))
+
+def test_pure_equality_is_not_eliminated():
+    kb = _kb("a = b", "P(a)", "¬P(b)")
+    eliminate_pure(kb)
+    assert _clause(equation(a, b)) in kb
+
+def test_preprocessing_keeps_equality_resolvents():
+    # a = b makes P(a) and ¬P(b) resolvable, so ¬P(b) must not be eliminated as blocked
+    kb = _kb("P(a)", "a = b")
+    for preprocess in (False, True):
+        result = prove(kb, _goal("P(b)"), equality=True, preprocess=preprocess,
+                       limits=ProofLimits(max_generated=1000))
+        assert result.status == ProofStatus.PROVED
+
+
+def test_set_of_support_ignored_under_equality():
+    # P(a) needs b = a to rewrite the axiom P(b), which set-of-support alone never does
+    kb = _kb("P(b)", "b = a")
+    for preprocess in (False, True):
+        result = prove(kb, _goal("P(a)"), equality=True, set_of_support=True,
+                       preprocess=preprocess, limits=ProofLimits(max_generated=1000))
+        assert result.status == ProofStatus.PROVED
@@ -0,0 +1,61 @@
+import pickle
+import pytest
+from multiprocessing import shared_memory
+from logic_syntax import Var, Function, Not, And, Or, Implies, Iff, ForAll, Exists
+from structure import Literal, Clause
+from formula_parser import parse_formula
+from clausal_form import clausal_form_converter
+from wire import encode, decode, encode_many, decode_many, WireError, MAGIC
+
+UNIVERSAL = "u"
+CONSTANT = "c"
+
+
+def test_round_trip_every_node_type():
+    x = Var("x", UNIVERSAL, "nat")
+    a = Var("a", CONSTANT)
+    body = Iff(Literal("P", (x, Function("f", (x, a), "nat"))), Not(Literal("Q", (), False)))
+    f = ForAll(x, Exists(a, Implies(And(body, Or(body, Literal("R", ("s", -3, 42)))), body), "nat"))
+    assert decode(encode(f)) == f
+
+def test_round_trip_clauses_share_symbols():
+    clauses = clausal_form_converter(parse_formula("∀x, P(x) ∧ Q(x, c) → R(f(x)) ∨ S(c)"))
+    data = encode_many(clauses)
+    assert decode_many(data) == clauses
+    assert len(data) < len(pickle.dumps(clauses))
+    assert data.count(b"P") == 1
+
+def test_deep_formula_without_recursion():
+    f = Literal("P", ())
+    for _ in range(50000):
+        f = Not(f)
+    g = decode(encode(f))
+    depth = 0
+    while isinstance(g, Not):
+        g = g.sub
+        depth += 1
+    assert depth == 50000 and g == Literal("P", ())
+
+def test_decode_from_shared_memory():
+    clause = Clause(frozenset({Literal("P", (Var("x", UNIVERSAL),)), Literal("Q", (), False)}))
+    data = encode(clause)
+    block = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        block.buf[:len(data)] = data
+        view = block.buf[:len(data)]
+        assert decode(view) == clause
+        view.release()
+    finally:
+        block.close()
+        block.unlink()
+
+def test_rejects_bad_input():
+    data = encode(Literal("P", ()))
+    with pytest.raises(WireError):
+        decode(b"nope" + data[4:])
+    with pytest.raises(WireError):
+        decode(MAGIC + bytes([99]) + data[5:])
+    with pytest.raises(WireError):
+        decode(data[:-1])
+    with pytest.raises(WireError):
+        encode(object())
@@ -0,0 +1,322 @@
+from logic_syntax import *
+from structure import *
+from clausal_form import clausal_form_converter, UNIVERSAL, EXISTENTIAL, CONSTANT
+from unification import is_variable
+from superposition import EQUALITY
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, TextIO
+import os
+import re
+
+
+# Groups: comment, token. Quoted atoms come first so a % inside quotes is not a comment
+_TOKEN = re.compile(r"""
+    \s+
+  | (%.*)
+  | ( '(?:[^'\\]|\\.)*' | "(?:[^"\\]|\\.)*"
+    | \$?[A-Za-z0-9_]+
+    | <=> | <~> | => | <= | ~\| | ~& | != | [!?~&|=()\[\],:.]
+    | \S )
+""", re.VERBOSE)
+_BLOCK_COMMENT = re.compile(r"/\*.*?\*/")
+
+_NON_ASSOC = {
+    "<=>": lambda a, b: Iff(a, b),
+    "=>": lambda a, b: Implies(a, b),
+    "<=": lambda a, b: Implies(b, a),
+    "<~>": lambda a, b: Not(Iff(a, b)),
+    "~|": lambda a, b: Not(Or(a, b)),
+    "~&": lambda a, b: Not(And(a, b)),
+}
+_LOWER_WORD = re.compile(r"[a-z][A-Za-z0-9_]*")
+
+
+@dataclass(frozen=True)
+class TPTPInput:
+    language: str   # "cnf" or "fof"
+    name: str
+    role: str
+    formula: Any    # a Clause for cnf, a Formula for fof
+
+
+def _statements(lines: Iterable[str]) -> Iterator[List[str]]:
+    # Groups tokens into statements, each one ends with a '.' outside any parentheses
+    tokens: List[str] = []
+    depth = 0
+    in_block = False
+    for line in lines:
+        if in_block or "/*" in line:
+            if in_block:
+                end = line.find("*/")
+                if end < 0:
+                    continue
+                line = line[end + 2:]
+                in_block = False
+            line = _BLOCK_COMMENT.sub(" ", line)
+            start = line.find("/*")
+            if start >= 0:
+                line = line[:start]
+                in_block = True
+        for comment, token in _TOKEN.findall(line):
+            if comment or not token:
+                if comment:
+                    break
+                continue
+            tokens.append(token)
+            if token == "(" or token == "[":
+                depth += 1
+            elif token == ")" or token == "]":
+                depth -= 1
+            elif token == "." and depth == 0:
+                yield tokens
+                tokens = []
+    if tokens:
+        raise ValueError(f"Unterminated TPTP statement starting with {' '.join(tokens[:4])!r}")
+
+
+def _unquote(token: str) -> str:
+    # 'Man' and Man name the same symbol once read, so write_tptp output loads back unchanged
+    if token[0] != "'":
+        return token
+    return re.sub(r"\\(.)", r"\1", token[1:-1])
+
+
+class _Parser:
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens + ["<end>"]
+        self.pos = 0
+        self.bound: Dict[str, Var] = {}
+        self.language = ""
+
+    def _peek(self) -> str:
+        return self.tokens[self.pos]
+
+    def _next(self) -> str:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def _expect(self, token: str) -> None:
+        found = self._next()
+        if found != token:
+            raise ValueError(f"Expected {token!r} in TPTP input but found {found!r}")
+
+    def statement(self) -> tuple:
+        language = self.language = self._next()
+        self._expect("(")
+        if language == "include":
+            path = _unquote(self._next())
+            selection = None
+            if self._peek() == ",":
+                self._next()
+                selection = set(self._name_list())
+            self._expect(")")
+            self._expect(".")
+            return ("include", path, selection)
+        if language not in ("cnf", "fof"):
+            raise ValueError(f"Unsupported TPTP language {language!r}")
+        name = self._next()
+        self._expect(",")
+        role = self._next()
+        self._expect(",")
+        f = self._formula()
+        # Source and useful info annotations are skipped. Anything else left over, such as the
+        # | r of an unparenthesized p & q | r, is an error rather than silently dropped.
+        if self._peek() == ",":
+            self._next()
+            depth = 0
+            while not (depth == 0 and self._peek() == ")"):
+                token = self._next()
+                if token == "<end>":
+                    raise ValueError(f"Unterminated TPTP statement {name}")
+                if token == "(" or token == "[":
+                    depth += 1
+                elif token == ")" or token == "]":
+                    depth -= 1
+        self._expect(")")
+        self._expect(".")
+        if language == "cnf":
+            f = _to_clause(f)
+        return (language, name, role, f)
+
+    def _name_list(self) -> List[str]:
+        self._expect("[")
+        names = []
+        while self._peek() != "]":
+            token = self._next()
+            if token != ",":
+                names.append(token)
+        self._expect("]")
+        return names
+
+    def _formula(self) -> Formula:
+        left = self._unitary()
+        op = self._peek()
+        if op == "|" or op == "&":
+            build = Or if op == "|" else And
+            while self._peek() == op:
+                self._next()
+                left = build(left, self._unitary())
+            return left
+        if op in _NON_ASSOC:
+            self._next()
+            return _NON_ASSOC[op](left, self._unitary())
+        return left
+
+    def _unitary(self) -> Formula:
+        token = self._peek()
+        if token == "(":
+            self._next()
+            f = self._formula()
+            self._expect(")")
+            return f
+        if token == "~":
+            self._next()
+            sub = self._unitary()
+            if isinstance(sub, Literal) and sub.positive:
+                return sub.negate()
+            return Not(sub)
+        if token == "!" or token == "?":
+            return self._quantified()
+        return self._atom()
+
+    def _quantified(self) -> Formula:
+        kind = self._next()
+        names = self._name_list()
+        self._expect(":")
+        saved = dict(self.bound)
+        variables = []
+        for name in names:
+            v = Var(name, UNIVERSAL if kind == "!" else EXISTENTIAL)
+            self.bound[name] = v
+            variables.append(v)
+        sub = self._unitary()
+        self.bound = saved
+        for v in reversed(variables):
+            sub = ForAll(v, sub) if kind == "!" else Exists(v, sub)
+        return sub
+
+    def _atom(self) -> Literal:
+        term = self._term()
+        if self._peek() in ("=", "!="):
+            positive = self._next() == "="
+            return Literal(EQUALITY, (term, self._term()), positive)
+        if isinstance(term, Function):
+            return Literal(term.name, term.args)
+        if isinstance(term, Var) and term.type == CONSTANT:
+            if term.name in ("$true", "$false") and self.language != "cnf":
+                raise ValueError(f"{term.name} is only supported in cnf statements")
+            return Literal(term.name, ())
+        raise ValueError(f"Expected an atom in TPTP input but found variable {term}")
+
+    def _term(self) -> Any:
+        token = self._next()
+        if token[0].isupper():
+            return self.bound.get(token) or Var(token, UNIVERSAL)
+        if not (token[0].isalnum() or token[0] in "'\"$_"):
+            raise ValueError(f"Expected a term in TPTP input but found {token!r}")
+        token = _unquote(token)
+        if self._peek() != "(":
+            return Var(token, CONSTANT)
+        self._next()
+        args = [self._term()]
+        while self._peek() == ",":
+            self._next()
+            args.append(self._term())
+        self._expect(")")
+        return Function(token, tuple(args))
+
+
+def _to_clause(f: Formula) -> Optional[Clause]:
+    # Flattens a cnf disjunction, None for a clause made true by $true
+    literals = set()
+    stack = [f]
+    while stack:
+        g = stack.pop()
+        if isinstance(g, Or):
+            stack.append(g.left)
+            stack.append(g.right)
+        elif isinstance(g, Literal) and not g.args and g.name in ("$true", "$false"):
+            if (g.name == "$true") == g.positive:
+                return None
+        elif isinstance(g, Literal):
+            literals.add(g)
+        else:
+            raise ValueError(f"cnf formula is not a disjunction of literals: {f}")
+    return Clause(frozenset(literals))
+
+
+def read_tptp(lines: Iterable[str], include_root: Optional[str] = None,
+              selection: Optional[set] = None) -> Iterator[TPTPInput]:
+    # Includes are resolved against include_root (the TPTP directory), like the TPTP tools do
+    for tokens in _statements(lines):
+        item = _Parser(tokens).statement()
+        if item[0] == "include":
+            _, path, names = item
+            if include_root is None:
+                raise ValueError(f"include('{path}') needs an include_root")
+            with open(os.path.join(include_root, path), encoding="utf-8") as f:
+                yield from read_tptp(f, include_root, names)
+            continue
+        language, name, role, formula = item
+        if selection is not None and name not in selection:
+            continue
+        if formula is not None:
+            yield TPTPInput(language, name, role, formula)
+
+def tptp_clauses(lines: Iterable[str], include_root: Optional[str] = None) -> Iterator[tuple[str, Clause]]:
+    # fof goes through clausal_form_converter, a conjecture is negated first
+    for item in read_tptp(lines, include_root):
+        if item.language == "cnf":
+            yield item.role, item.formula
+        elif item.role == "conjecture":
+            for clause in clausal_form_converter(Not(item.formula)):
+                yield "negated_conjecture", clause
+        else:
+            for clause in clausal_form_converter(item.formula):
+                yield item.role, clause
+
+def load_tptp(lines: Iterable[str], kb: KB, include_root: Optional[str] = None) -> List[Clause]:
+    # Adds every axiom and hypothesis to the KB, returns the negated conjecture clauses
+    goals = []
+    for role, clause in tptp_clauses(lines, include_root):
+        if role == "negated_conjecture":
+            goals.append(clause)
+        elif clause not in kb:
+            kb.add_clause(clause)
+    return goals
+
+
+def _tptp_name(name: str) -> str:
+    if _LOWER_WORD.fullmatch(name) or name[:1] == "$" or name.isdigit():
+        return name
+    return "'" + name.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+def _tptp_var(name: str) -> str:
+    name = re.sub(r"\W", "_", name)
+    return name[0].upper() + name[1:] if name[0].isalpha() else "X" + name
+
+def _tptp_term(t: Any) -> str:
+    if is_variable(t):
+        return _tptp_var(t.name)
+    if isinstance(t, Function):
+        return f"{_tptp_name(t.name)}({','.join(_tptp_term(a) for a in t.args)})"
+    if isinstance(t, Var):
+        return _tptp_name(t.name)
+    return _tptp_name(str(t))
+
+def _tptp_literal(lit: Literal) -> str:
+    if lit.name == EQUALITY and len(lit.args) == 2:
+        op = "=" if lit.positive else "!="
+        return f"{_tptp_term(lit.args[0])} {op} {_tptp_term(lit.args[1])}"
+    atom = _tptp_name(lit.name)
+    if lit.args:
+        atom += f"({','.join(_tptp_term(a) for a in lit.args)})"
+    return atom if lit.positive else "~" + atom
+
+def write_tptp(kb: KB, out: TextIO, role: str = "axiom", prefix: str = "c") -> int:
+    # One cnf line per clause, written straight from KB.clauses
+    for i, clause in enumerate(kb.clauses, 1):
+        body = " | ".join(_tptp_literal(lit) for lit in clause.literals) if clause.literals else "$false"
+        out.write(f"cnf({prefix}{i}, {role}, ({body})).\n")
+    return len(kb.clauses)
@@ -0,0 +1,190 @@
+from logic_syntax import Var, Function
+from structure import Literal, Clause
+from clausal_form import CONSTANT
+from itertools import count
+from typing import Any, Dict, Iterator, Optional
+
+
+Substitution = Dict[Var, Any]
+
+_rename_counter = count()
+
+
+def is_variable(t: Any) -> bool:
+    # Skolem constants are Vars too, but they can never be bound
+    return isinstance(t, Var) and t.type != CONSTANT
+
+def walk(t: Any, theta: Substitution) -> Any:
+    while is_variable(t) and t in theta:
+        t = theta[t]
+    return t
+
+def substitute(t: Any, theta: Substitution) -> Any:
+    # Explicit stack, so terms nested deeper than the recursion limit still go through.
+    # A Function is pushed again once its arguments are done, and then takes them off built.
+    built: list = []
+    stack: list = [(t, False)]
+    while stack:
+        u, ready = stack.pop()
+        if ready:
+            n = len(built) - len(u.args)
+            args = tuple(built[n:])
+            del built[n:]
+            built.append(Function(u.name, args, u.range))
+            continue
+        u = walk(u, theta)
+        if isinstance(u, Function):
+            stack.append((u, True))
+            stack.extend((a, False) for a in reversed(u.args))
+        else:
+            built.append(u)
+    return built[0]
+
+def substitute_literal(lit: Literal, theta: Substitution) -> Literal:
+    if not theta:
+        return lit
+    return Literal(lit.name, tuple(substitute(a, theta) for a in lit.args), lit.positive)
+
+def substitute_clause(clause: Clause, theta: Substitution) -> Clause:
+    if not theta:
+        return clause
+    return Clause(frozenset(substitute_literal(lit, theta) for lit in clause.literals))
+
+def occurs(v: Var, t: Any, theta: Substitution) -> bool:
+    stack = [t]
+    while stack:
+        u = walk(stack.pop(), theta)
+        if u == v:
+            return True
+        if isinstance(u, Function):
+            stack.extend(u.args)
+    return False
+
+
+def unify(a: Any, b: Any, theta: Optional[Substitution] = None) -> Optional[Substitution]:
+    # Returns a triangular substitution (use substitute() to resolve it) or None
+    theta = {} if theta is None else dict(theta)
+    stack = [(a, b)]
+    while stack:
+        s, t = stack.pop()
+        s = walk(s, theta)
+        t = walk(t, theta)
+        if s == t:
+            continue
+        if is_variable(s):
+            if occurs(s, t, theta):
+                return None
+            theta[s] = t
+        elif is_variable(t):
+            if occurs(t, s, theta):
+                return None
+            theta[t] = s
+        elif isinstance(s, Function) and isinstance(t, Function):
+            if s.name != t.name or len(s.args) != len(t.args):
+                return None
+            stack.extend(zip(s.args, t.args))
+        elif isinstance(s, tuple) and isinstance(t, tuple):
+            if len(s) != len(t):
+                return None
+            stack.extend(zip(s, t))
+        else:
+            return None
+    return theta
+
+def unify_literals(l1: Literal, l2: Literal, theta: Optional[Substitution] = None) -> Optional[Substitution]:
+    # Sign is ignored, callers decide whether they want complementary or equal literals
+    if l1.name != l2.name or len(l1.args) != len(l2.args):
+        return None
+    return unify(l1.args, l2.args, theta)
+
+
+def match(pattern: Any, target: Any, theta: Optional[Substitution] = None) -> Optional[Substitution]:
+    # One-way unification: only variables of the pattern get bound
+    theta = {} if theta is None else dict(theta)
+    stack = [(pattern, target)]
+    while stack:
+        p, t = stack.pop()
+        if is_variable(p):
+            bound = theta.get(p)
+            if bound is None:
+                theta[p] = t
+            elif bound != t:
+                return None
+        elif isinstance(p, Function):
+            if not isinstance(t, Function) or p.name != t.name or len(p.args) != len(t.args):
+                return None
+            stack.extend(zip(p.args, t.args))
+        elif isinstance(p, tuple):
+            if not isinstance(t, tuple) or len(p) != len(t):
+                return None
+            stack.extend(zip(p, t))
+        elif p != t:
+            return None
+    return theta
+
+def match_literals(pattern: Literal, target: Literal, theta: Optional[Substitution] = None) -> Optional[Substitution]:
+    if pattern.positive != target.positive or pattern.name != target.name or len(pattern.args) != len(target.args):
+        return None
+    return match(pattern.args, target.args, theta)
+
+
+def subsumes(c: Clause, d: Clause) -> bool:
+    # C subsumes D when Cθ ⊆ D for some θ
+    if len(c.literals) > len(d.literals):
+        return False
+    keys = {(lit.name, lit.positive) for lit in d.literals}
+    if any((lit.name, lit.positive) not in keys for lit in c.literals):
+        return False
+    # Targets each literal matches on its own: one without any rules D out before backtracking,
+    # and the literals with the fewest go first so the search stays shallow
+    options = []
+    for lit in c.literals:
+        targets = [t for t in d.literals if match_literals(lit, t) is not None]
+        if not targets:
+            return False
+        options.append((lit, targets))
+    options.sort(key=lambda o: len(o[1]))
+    return _subsumes_helper(options, 0, {})
+
+def _subsumes_helper(options: list[tuple[Literal, list[Literal]]], i: int, theta: Substitution) -> bool:
+    if i == len(options):
+        return True
+    lit, targets = options[i]
+    for t in targets:
+        th = match_literals(lit, t, theta)
+        if th is not None and _subsumes_helper(options, i + 1, th):
+            return True
+    return False
+
+
+def term_variables(t: Any) -> Iterator[Var]:
+    # Left to right, repeats included
+    stack = [t]
+    while stack:
+        u = stack.pop()
+        if is_variable(u):
+            yield u
+        elif isinstance(u, Function):
+            stack.extend(reversed(u.args))
+
+def term_weight(t: Any) -> int:
+    # Symbol count, every function symbol, constant and variable weighs 1
+    n = 0
+    stack = [t]
+    while stack:
+        u = stack.pop()
+        n += 1
+        if isinstance(u, Function):
+            stack.extend(u.args)
+    return n
+
+def clause_variables(clause: Clause) -> set[Var]:
+    return {v for lit in clause.literals for a in lit.args for v in term_variables(a)}
+
+def _fresh_var(v: Var) -> Var:
+    base = v.name.split("'")[0]
+    return Var(name=f"{base}'{next(_rename_counter)}", type=v.type, domain=v.domain)
+
+def rename_clause(clause: Clause) -> Clause:
+    # Renames every variable apart so two clauses never share a variable
+    return substitute_clause(clause, {v: _fresh_var(v) for v in clause_variables(clause)})
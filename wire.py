@@ -0,0 +1,264 @@
+from logic_syntax import *
+from structure import *
+from typing import Iterable, Union
+
+
+# Layout: MAGIC, VERSION, symbol table (count, then length-prefixed UTF-8), root count, then every
+# root as a flat prefix-order node array. Node = tag byte + varint fields, children follow their parent.
+MAGIC = b"FOLW"
+VERSION = 1
+
+_VAR = 0            # name, type, domain
+_FUNCTION = 1       # name, range, arity
+_LITERAL = 2        # name, arity (positive)
+_NEG_LITERAL = 3    # name, arity
+_NOT = 4
+_AND = 5
+_OR = 6
+_IMPLIES = 7
+_IFF = 8
+_FORALL = 9         # domain, then var and body
+_EXISTS = 10        # domain, then var and body
+_CLAUSE = 11        # literal count
+_STR = 12           # symbol
+_INT = 13           # zigzag varint
+
+# Children to read after the fields of each tag, None when a count field says how many
+_ARITY = {_VAR: 0, _FUNCTION: None, _LITERAL: None, _NEG_LITERAL: None, _NOT: 1, _AND: 2, _OR: 2,
+          _IMPLIES: 2, _IFF: 2, _FORALL: 2, _EXISTS: 2, _CLAUSE: None, _STR: 0, _INT: 0}
+_BINARY = {And: _AND, Or: _OR, Iff: _IFF}
+_BUILD = {_AND: And, _OR: Or, _IFF: Iff}
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class WireError(ValueError):
+    pass
+
+
+def _varint(out: bytearray, n: int) -> None:
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+class _Encoder:
+    def __init__(self):
+        self.symbols: Dict[str, int] = {}
+        self.body = bytearray()
+
+    def _symbol(self, s: Optional[str]) -> int:
+        # 0 encodes None, so optional fields like Var.domain need no flag
+        if s is None:
+            return 0
+        i = self.symbols.get(s)
+        if i is None:
+            i = self.symbols[s] = len(self.symbols) + 1
+        return i
+
+    def add(self, root: Any) -> None:
+        # Iterative, so deep formulas do not hit the recursion limit
+        out = self.body
+        symbol = self._symbol
+        stack = [root]
+        while stack:
+            x = stack.pop()
+            if isinstance(x, Literal):
+                out.append(_LITERAL if x.positive else _NEG_LITERAL)
+                _varint(out, symbol(x.name))
+                _varint(out, len(x.args))
+                stack.extend(reversed(x.args))
+            elif isinstance(x, Var):
+                out.append(_VAR)
+                _varint(out, symbol(x.name))
+                _varint(out, symbol(x.type))
+                _varint(out, symbol(x.domain))
+            elif isinstance(x, Function):
+                out.append(_FUNCTION)
+                _varint(out, symbol(x.name))
+                _varint(out, symbol(x.range))
+                _varint(out, len(x.args))
+                stack.extend(reversed(x.args))
+            elif isinstance(x, Clause):
+                # Frozenset order is arbitrary, the decoder rebuilds the same set
+                out.append(_CLAUSE)
+                _varint(out, len(x.literals))
+                stack.extend(x.literals)
+            elif isinstance(x, Not):
+                out.append(_NOT)
+                stack.append(x.sub)
+            elif type(x) in _BINARY:
+                out.append(_BINARY[type(x)])
+                stack.append(x.right)
+                stack.append(x.left)
+            elif isinstance(x, Implies):
+                out.append(_IMPLIES)
+                stack.append(x.then)
+                stack.append(x.provided)
+            elif isinstance(x, ForAll) or isinstance(x, Exists):
+                out.append(_FORALL if isinstance(x, ForAll) else _EXISTS)
+                _varint(out, symbol(x.domain))
+                stack.append(x.sub)
+                stack.append(x.var)
+            elif isinstance(x, str):
+                out.append(_STR)
+                _varint(out, symbol(x))
+            elif isinstance(x, int) and not isinstance(x, bool):
+                out.append(_INT)
+                _varint(out, x << 1 if x >= 0 else ((-x) << 1) - 1)
+            else:
+                raise WireError(f"Cannot encode {type(x).__name__}")
+
+    def getvalue(self, roots: int) -> bytes:
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        _varint(out, len(self.symbols))
+        for s in self.symbols:
+            data = s.encode("utf-8")
+            _varint(out, len(data))
+            out += data
+        _varint(out, roots)
+        out += self.body
+        return bytes(out)
+
+
+def encode(obj: Any) -> bytes:
+    return encode_many([obj])
+
+def encode_many(objs: Iterable[Any]) -> bytes:
+    # One symbol table for all objects, so a batch of clauses stores every predicate name once
+    encoder = _Encoder()
+    roots = 0
+    for obj in objs:
+        encoder.add(obj)
+        roots += 1
+    return encoder.getvalue(roots)
+
+
+class _Reader:
+    # Reads straight from the buffer through a memoryview, only symbol strings are copied out
+    def __init__(self, buf: Buffer):
+        view = memoryview(buf)
+        self.view = view if view.format == "B" else view.cast("B")
+        self.pos = 0
+
+    def byte(self) -> int:
+        try:
+            b = self.view[self.pos]
+        except IndexError:
+            raise WireError("Truncated wire data") from None
+        self.pos += 1
+        return b
+
+    def varint(self) -> int:
+        view, pos = self.view, self.pos
+        n = shift = 0
+        try:
+            while True:
+                b = view[pos]
+                pos += 1
+                n |= (b & 0x7F) << shift
+                if b < 0x80:
+                    break
+                shift += 7
+        except IndexError:
+            raise WireError("Truncated wire data") from None
+        self.pos = pos
+        return n
+
+def _header(reader: _Reader) -> List[Optional[str]]:
+    if bytes(reader.view[:len(MAGIC)]) != MAGIC:
+        raise WireError("Not a wire encoded formula")
+    reader.pos = len(MAGIC)
+    version = reader.byte()
+    if version != VERSION:
+        raise WireError(f"Unsupported wire format version {version}")
+    symbols: List[Optional[str]] = [None]
+    for _ in range(reader.varint()):
+        n = reader.varint()
+        if reader.pos + n > len(reader.view):
+            raise WireError("Truncated wire data")
+        symbols.append(str(reader.view[reader.pos:reader.pos + n], "utf-8"))
+        reader.pos += n
+    return symbols
+
+def _build(tag: int, fields: tuple, children: list) -> Any:
+    if tag == _LITERAL or tag == _NEG_LITERAL:
+        return Literal(fields[0], tuple(children), tag == _LITERAL)
+    if tag == _FUNCTION:
+        return Function(fields[0], tuple(children), fields[1])
+    if tag == _CLAUSE:
+        return Clause(frozenset(children))
+    if tag == _NOT:
+        return Not(children[0])
+    if tag == _IMPLIES:
+        return Implies(children[0], children[1])
+    if tag == _FORALL:
+        return ForAll(children[0], children[1], fields[0])
+    if tag == _EXISTS:
+        return Exists(children[0], children[1], fields[0])
+    return _BUILD[tag](children[0], children[1])
+
+def _read_node(reader: _Reader, symbols: List[Optional[str]]) -> Any:
+    # Prefix order: a node with children opens a frame, finished values are handed to the frame on top
+    frames: List[tuple[int, tuple, int, list]] = []
+    while True:
+        tag = reader.byte()
+        if tag not in _ARITY:
+            raise WireError(f"Unknown node tag {tag}")
+        try:
+            if tag == _VAR:
+                value = Var(symbols[reader.varint()], symbols[reader.varint()], symbols[reader.varint()])
+                needed = 0
+            elif tag == _STR:
+                value = symbols[reader.varint()]
+                needed = 0
+            elif tag == _INT:
+                n = reader.varint()
+                value = n >> 1 if not n & 1 else -((n + 1) >> 1)
+                needed = 0
+            elif tag == _FUNCTION:
+                fields = (symbols[reader.varint()], symbols[reader.varint()])
+                needed = reader.varint()
+            elif tag == _LITERAL or tag == _NEG_LITERAL:
+                fields = (symbols[reader.varint()],)
+                needed = reader.varint()
+            elif tag == _CLAUSE:
+                fields = ()
+                needed = reader.varint()
+            elif tag == _FORALL or tag == _EXISTS:
+                fields = (symbols[reader.varint()],)
+                needed = 2
+            else:
+                fields = ()
+                needed = _ARITY[tag]
+        except IndexError:
+            raise WireError("Symbol index out of range") from None
+        if _ARITY[tag] == 0:
+            pass
+        elif needed:
+            frames.append((tag, fields, needed, []))
+            continue
+        else:
+            value = _build(tag, fields, [])
+        while True:
+            if not frames:
+                return value
+            top = frames[-1]
+            top[3].append(value)
+            if len(top[3]) < top[2]:
+                break
+            frames.pop()
+            value = _build(top[0], top[1], top[3])
+
+def decode(buf: Buffer) -> Any:
+    objs = decode_many(buf)
+    if len(objs) != 1:
+        raise WireError(f"Expected one encoded object, found {len(objs)}")
+    return objs[0]
+
+def decode_many(buf: Buffer) -> List[Any]:
+    # buf may be a memoryview over shared memory, nothing is copied before decoding
+    reader = _Reader(buf)
+    symbols = _header(reader)
+    return [_read_node(reader, symbols) for _ in range(reader.varint())]